@@ -0,0 +1,53 @@
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from geterate_trees import compile_all, find_sources
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples', 'test_files', 'e*')
+
+
+def replicate(directory, copies):
+    files = sorted(glob.glob(CORPUS))
+    for i in range(copies):
+        for fname in files:
+            shutil.copyfile(fname, os.path.join(directory, '{}_{}.txt'.format(os.path.basename(fname), i)))
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measures how the batch compiler scales with workers.')
+    argparser.add_argument('--copies', type=int, default=1000, help='how many times the corpus is replicated')
+    argparser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    argparser.add_argument('-t', '--target', choices=('dot', 'python'), default='python')
+    args = argparser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='nonek_batch_')
+    try:
+        replicate(directory, args.copies)
+        sources = find_sources(directory, ['*.txt'])
+        output_dir = os.path.join(directory, 'out')
+
+        counts = sorted(set([2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers]
+                            + [args.max_workers]))
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            results = compile_all(sources, directory, args.target, workers, output_dir)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for result in results if result[3] is not None)
+            baseline = baseline or elapsed
+
+            print('{:>3} workers {:>8} files {:>8.3f}s {:>10.0f} files/s speedup {:.2f}x, {} failed'
+                  .format(workers, len(sources), elapsed, len(sources) / elapsed, baseline / elapsed, failed))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.lexical_analysis.lexer import KEYWORDS
+from interpreter.syntax_analysis.parser import LEXERS
+
+IDENTIFIERS = ['a', 'counter', 'value2', 'Stdio', 'String', 'inINT', 'isInterpunction', 'words']
+
+
+def generate(count, seed):
+    """
+    Identifier heavy input: keywords, plain identifiers and variables separated by single spaces.
+    """
+    rnd = random.Random(seed)
+    words = sorted(KEYWORDS) + IDENTIFIERS + ['#' + name for name in IDENTIFIERS]
+    lines = []
+    for i in range(0, count, 10):
+        lines.append(' '.join(rnd.choice(words) for _ in range(10)))
+    return '\n'.join(lines)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measures lexing speed of keywords and identifiers.')
+    argparser.add_argument('--count', type=int, default=300000, help='number of words in the input')
+    argparser.add_argument('--repeat', type=int, default=3, help='best of how many runs is reported')
+    argparser.add_argument('--seed', type=int, default=0)
+    args = argparser.parse_args()
+
+    text = generate(args.count, args.seed)
+    for name, lexer_class in sorted(LEXERS.items()):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            tokens = lexer_class(text).tokenize()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        print('{:<12} {:>10} tokens {:>8.3f}s {:>12.0f} tokens/s'.format(name, len(tokens), best, len(tokens) / best))
+
+
+if __name__ == '__main__':
+    main()
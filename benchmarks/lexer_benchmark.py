@@ -0,0 +1,58 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.lexical_analysis.tokenType import EOF
+from interpreter.syntax_analysis.parser import LEXERS
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples', 'test_files', 'e*')
+
+
+def load_corpus(scale):
+    files = sorted(glob.glob(CORPUS))
+    text = '\n'.join(open(fname, 'r').read() for fname in files)
+    return '\n'.join([text] * scale)
+
+
+def lex(lexer_class, text):
+    lexer = lexer_class(text)
+    tokens = []
+    token = lexer.get_next_token()
+    while token.type != EOF:
+        tokens.append((token.type, token.value, lexer.line_count))
+        token = lexer.get_next_token()
+    return tokens
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compares tokens per second of the lexer engines.')
+    argparser.add_argument('--scale', type=int, default=1000, help='how many times the corpus is repeated')
+    argparser.add_argument('--repeat', type=int, default=3, help='best of how many runs is reported')
+    args = argparser.parse_args()
+
+    text = load_corpus(args.scale)
+    print('corpus: {} characters, {} lines'.format(len(text), text.count('\n') + 1))
+
+    reference = None
+    for name, lexer_class in sorted(LEXERS.items()):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            tokens = lex(lexer_class, text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        if reference is None:
+            reference = tokens
+        elif tokens != reference:
+            raise Exception('Lexer {} produced a different token stream.'.format(name))
+
+        print('{:<12} {:>10} tokens {:>8.3f}s {:>12.0f} tokens/s'.format(name, len(tokens), best, len(tokens) / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.compilation import runner
+from interpreter.optimization.optimizer import MAX_LEVEL
+from interpreter.workloads.examples import EXAMPLES, inputs
+
+# arithmetic with literals, identities and literal assignments inside a loop
+KERNEL = """Libraries {
+-> Stdio
+}
+
+Execution {
+    INT i
+    INT s
+    INT t
+    #i = 0
+    #s = 0
+    LOOP: (#i < %d) -> {
+        #t = 0
+        #s = #s + #i * 1 - 0 + 60 * 60 * 24 - -3 + #t
+        #t = 2 * 3 + 4 / 2
+        #i = #i + 1
+    }
+    @Stdio.out(#s)
+}
+"""
+
+
+def measure(source, stdin, optimize, repeat):
+    best = None
+    for _ in range(repeat):
+        stdout = io.StringIO()
+        random.seed(0)
+        start = time.perf_counter()
+        runner.run(source, io.StringIO(stdin), stdout, optimize=optimize)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, stdout.getvalue()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compares running the generated Python at each -O level.')
+    argparser.add_argument('--size', type=int, default=200000, help='approximate loop iterations per program')
+    argparser.add_argument('--repeat', type=int, default=3, help='best of how many runs is reported')
+    args = argparser.parse_args()
+
+    # created empty here, so no other process can take the name before inputs writes it
+    fd, text_file = tempfile.mkstemp(prefix='nonek_opt_')
+    os.close(fd)
+    try:
+        programs = [('kernel', KERNEL % args.size, '')]
+        for name, stdin in sorted(inputs(args.size, text_file).items()):
+            with open(os.path.join(EXAMPLES, name), 'r') as f:
+                programs.append((name, f.read(), stdin))
+
+        levels = range(MAX_LEVEL + 1)
+        print('{:<8}'.format('program') + ''.join('{:>10}'.format('-O{}'.format(level)) for level in levels))
+        totals = [0] * len(levels)
+        for name, source, stdin in programs:
+            times = []
+            outputs = set()
+            for level in levels:
+                elapsed, output = measure(source, stdin, level, args.repeat)
+                times.append(elapsed)
+                totals[level] += elapsed
+                outputs.add(output)
+            if len(outputs) != 1:
+                raise Exception('Output of {} differs between -O levels'.format(name))
+            print('{:<8}'.format(name) + ''.join('{:>9.4f}s'.format(elapsed) for elapsed in times))
+        print('{:<8}'.format('total') + ''.join('{:>9.4f}s'.format(elapsed) for elapsed in totals))
+    finally:
+        if os.path.exists(text_file):
+            os.remove(text_file)
+
+
+if __name__ == '__main__':
+    main()
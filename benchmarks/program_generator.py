@@ -0,0 +1,30 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.workloads.program_generator import generate
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Writes a synthetic nonek program of the given size and shape.')
+    argparser.add_argument('-o', '--output', default='-', help='output file, - for standard output')
+    argparser.add_argument('--lines', type=int, default=1000, help='approximate number of lines')
+    argparser.add_argument('--functions', type=int, default=10)
+    argparser.add_argument('--depth', type=int, default=3, help='deepest nesting of COND and LOOP')
+    argparser.add_argument('--expression', type=int, default=4, help='operands per expression')
+    argparser.add_argument('--variables', type=int, default=8, help='variables per scope')
+    argparser.add_argument('--seed', type=int, default=0)
+    args = argparser.parse_args()
+
+    text = generate(args.lines, args.functions, args.depth, args.expression, args.variables, args.seed)
+    if args.output == '-':
+        sys.stdout.write(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
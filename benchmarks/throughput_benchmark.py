@@ -0,0 +1,174 @@
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.compilation import python_ast
+from interpreter.compilation.python_source import ASTVisualizer
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.lexical_analysis.tokenStream import TokenStream
+from interpreter.optimization.optimizer import MAX_LEVEL, optimize
+from interpreter.semantic_analysis.analyzer import analyze
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.workloads.program_generator import generate
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'throughput_baseline.json')
+SIZES = (1000, 10000, 100000, 1000000)
+PHASES = ('lex', 'parse', 'analyze', 'codegen')
+
+
+def measure(text, optimize_level, backend):
+    """
+    Compiles the text once and returns the token count and the seconds of every phase. The text is lexed
+    before parsing, so the lexer and the parser are timed apart.
+    """
+    seconds = {}
+    start = time.perf_counter()
+    tokens = TokenStream.prelexed(Lexer(text))
+    seconds['lex'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree = Parser(tokens).parse()
+    seconds['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analysis = analyze(tree)
+    seconds['analyze'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree = optimize(tree, analysis, optimize_level)
+    if backend == 'ast':
+        python_ast.build_module(tree, analysis, optimize_level)
+    else:
+        ASTVisualizer(None, optimize=optimize_level).generate(tree, analysis)
+    seconds['codegen'] = time.perf_counter() - start
+    return len(tokens.buffer), seconds
+
+
+def run(sizes, shape, optimize_level, backend, repeat):
+    results = []
+    for size in sizes:
+        text = generate(size, **shape)
+        lines = text.count('\n')
+        best = {}
+        for _ in range(repeat):
+            token_count, seconds = measure(text, optimize_level, backend)
+            for phase, elapsed in seconds.items():
+                best[phase] = min(best.get(phase, elapsed), elapsed)
+            # the tree of the last size can be a few hundred MB, freed before the next run
+            gc.collect()
+
+        phases = {}
+        for phase in PHASES:
+            phases[phase] = {
+                'seconds': best[phase],
+                'tokens_per_second': token_count / best[phase],
+                'lines_per_second': lines / best[phase],
+            }
+        result = {'lines': lines, 'characters': len(text), 'tokens': token_count, 'phases': phases,
+                  'scaling': scaling(results[-1], lines, phases) if results else None}
+        results.append(result)
+        print_result(result)
+    return results
+
+
+def scaling(previous, lines, phases):
+    """
+    Exponent of the growth of every phase time from the previous size: 1 is linear, 2 quadratic.
+    """
+    ratio = math.log(lines / previous['lines'])
+    return {phase: math.log(phases[phase]['seconds'] / previous['phases'][phase]['seconds']) / ratio
+            for phase in PHASES}
+
+
+def print_result(result):
+    print('{} lines, {} tokens'.format(result['lines'], result['tokens']))
+    for phase in PHASES:
+        metrics = result['phases'][phase]
+        exponent = '' if result['scaling'] is None else 'scaling {:.2f}'.format(result['scaling'][phase])
+        print('    {:<8} {:>9.3f}s {:>12.0f} tokens/s {:>10.0f} lines/s  {}'
+              .format(phase, metrics['seconds'], metrics['tokens_per_second'], metrics['lines_per_second'], exponent))
+
+
+def compare(report, baseline, tolerance):
+    """
+    Prints the throughput of every phase relative to the baseline and returns the number of phases slower
+    than the baseline by more than tolerance.
+    """
+    if report['options'] != baseline['options']:
+        print('baseline measured with other options, not compared: {}'.format(baseline['options']))
+        return 0
+
+    regressions = 0
+    baseline_results = {result['lines']: result for result in baseline['results']}
+    for result in report['results']:
+        reference = baseline_results.get(result['lines'])
+        if reference is None:
+            continue
+        for phase in PHASES:
+            ratio = result['phases'][phase]['lines_per_second'] / reference['phases'][phase]['lines_per_second']
+            slower = ratio < 1 - tolerance
+            regressions += slower
+            print('{:>8} lines {:<8} {:>6.2f}x baseline{}'
+                  .format(result['lines'], phase, ratio, '  REGRESSION' if slower else ''))
+    return regressions
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measures lexer, parser and code generator throughput on '
+                                                    'generated programs of growing size.')
+    argparser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='program sizes in lines')
+    argparser.add_argument('--repeat', type=int, default=3, help='best of how many runs is reported')
+    argparser.add_argument('--functions', type=int, default=10)
+    argparser.add_argument('--depth', type=int, default=3, help='deepest nesting of COND and LOOP')
+    argparser.add_argument('--expression', type=int, default=4, help='operands per expression')
+    argparser.add_argument('--variables', type=int, default=8, help='variables per scope')
+    argparser.add_argument('--seed', type=int, default=0)
+    argparser.add_argument('-O', dest='optimize', type=int, nargs='?', const=1, default=0,
+                           choices=range(MAX_LEVEL + 1), help='optimization level, -O is -O1')
+    argparser.add_argument('--backend', choices=('ast', 'source'), default='source', help='code generator')
+    argparser.add_argument('--no-gc', action='store_true',
+                           help='disable the cyclic garbage collector while measuring, the trees only free together')
+    argparser.add_argument('-o', '--output', help='JSON file the results are written to')
+    argparser.add_argument('--baseline', default=BASELINE, help='JSON results compared against')
+    argparser.add_argument('--save-baseline', action='store_true', help='write the results as the baseline')
+    argparser.add_argument('--tolerance', type=float, default=0.1,
+                           help='fraction of the baseline throughput a phase can lose before it is a regression')
+    args = argparser.parse_args()
+
+    shape = {'functions': args.functions, 'depth': args.depth, 'expression': args.expression,
+             'variables': args.variables, 'seed': args.seed}
+    options = {'shape': shape, 'optimize': args.optimize, 'backend': args.backend}
+    if args.no_gc:
+        # only this process is affected, run still collects between sizes
+        options['gc'] = False
+        gc.disable()
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'options': options,
+        'results': run(sorted(args.sizes), shape, args.optimize, args.backend, args.repeat),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
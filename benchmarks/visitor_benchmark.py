@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import getastdot
+import getastpython
+from interpreter.semantic_analysis.analyzer import analyze
+from interpreter.syntax_analysis.parser import Parser
+
+STATEMENTS = """
+    #a = #b + #c * 2 - (#d - 1)
+    COND: ((#a < #b) AND (#c > 0)) -> {
+        #b = #b + 1
+        @Stdio.out(#b)
+    }
+    LOOP: (#d > 0) -> {
+        #d = #d - 1
+    }
+"""
+
+
+def generate(blocks):
+    return 'Libraries {\n-> Stdio\n}\nExecution {\n    INT a\n    INT b\n    INT c\n    INT d\n' + \
+           STATEMENTS * blocks + '}\n'
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measures visiting a large syntax tree with the code generators.')
+    argparser.add_argument('--blocks', type=int, default=5000, help='repetitions of the statement block')
+    argparser.add_argument('--repeat', type=int, default=3, help='best of how many runs is reported')
+    args = argparser.parse_args()
+
+    text = generate(args.blocks)
+    for name, module in (('python', getastpython), ('dot', getastdot)):
+        best = None
+        for _ in range(args.repeat):
+            parser = Parser.from_text(text)
+            tree = parser.parse()
+            # the Python generator reads the declared types from the Analysis
+            analysis = analyze(tree)
+            visualizer = module.ASTVisualizer(parser)
+            start = time.perf_counter()
+            if module is getastpython:
+                visualizer.generate(tree, analysis)
+            else:
+                visualizer.visit(tree)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print('{:<8} {:>8.3f}s for {} statement blocks'.format(name, best, args.blocks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.compilation import runner
+from interpreter.vm import machine
+from interpreter.workloads.examples import EXAMPLES, inputs
+
+
+def measure(run, source, stdin, repeat):
+    best = None
+    for _ in range(repeat):
+        stdout = io.StringIO()
+        random.seed(0)
+        start = time.perf_counter()
+        run(source, io.StringIO(stdin), stdout)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, stdout.getvalue()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compares the bytecode VM with running the generated Python.')
+    argparser.add_argument('--size', type=int, default=20000, help='approximate loop iterations per example')
+    argparser.add_argument('--repeat', type=int, default=3, help='best of how many runs is reported')
+    args = argparser.parse_args()
+
+    # created empty here, so no other process can take the name before inputs writes it
+    fd, text_file = tempfile.mkstemp(prefix='nonek_vm_')
+    os.close(fd)
+    try:
+        total_python = total_vm = 0
+        for name, stdin in sorted(inputs(args.size, text_file).items()):
+            with open(os.path.join(EXAMPLES, name), 'r') as f:
+                source = f.read()
+
+            # both backends compile once, only execution is measured
+            runner.compile_program(source)
+            program = machine.compile_source(source)
+
+            def run_vm(source, stdin, stdout):
+                machine.VirtualMachine(program, stdin, stdout).run()
+
+            python_time, python_output = measure(runner.run, source, stdin, args.repeat)
+            vm_time, vm_output = measure(run_vm, source, stdin, args.repeat)
+            if python_output != vm_output:
+                raise Exception('Outputs of {} differ.'.format(name))
+
+            total_python += python_time
+            total_vm += vm_time
+            print('{:<4} python {:>8.4f}s   vm {:>8.4f}s   vm/python {:>5.2f}'
+                  .format(name, python_time, vm_time, vm_time / python_time))
+        print('all  python {:>8.4f}s   vm {:>8.4f}s   vm/python {:>5.2f}'
+              .format(total_python, total_vm, total_vm / total_python))
+    finally:
+        if os.path.exists(text_file):
+            os.remove(text_file)
+
+
+if __name__ == '__main__':
+    main()
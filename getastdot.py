@@ -1,7 +1,7 @@
 import textwrap
 
 from interpreter.lexical_analysis.lexer import Lexer
-from interpreter.syntax_analysis.interpreter import NodeVisitor
+from interpreter.syntax_analysis.interpreter import NodeVisitor, left_spine
 from interpreter.syntax_analysis.parser import Parser
 
 
@@ -20,208 +20,228 @@ class ASTVisualizer(NodeVisitor):
 
     def visit_Program(self, node):
         s = 'node{} [label="Program"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
         for child in node.children:
-            self.visit(child)
-            s = 'node{} -> node{}\n'.format(node.num, child.num)
+            s = 'node{} -> node{}\n'.format(num, self.visit(child))
             self.dot_body.append(s)
 
+        return num
+
     def visit_Library(self, node):
         s = 'node{} [label="Library: {}"]\n'.format(self.nodecount, node.library)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
+        return num
+
     def visit_FunCall(self, node):
         s = 'node{} [label="FunCall: {} {}"]\n'.format(self.nodecount, node.lib_name, node.fun_name)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
         for child in node.args_nodes:
-            self.visit(child)
-            s = 'node{} -> node{}\n'.format(node.num, child.num)
+            s = 'node{} -> node{}\n'.format(num, self.visit(child))
             self.dot_body.append(s)
 
+        return num
+
     def visit_FunImpl(self, node):
         s = 'node{} [label="FunImpl: {}"]\n'.format(self.nodecount, node.fun_name)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.args_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.args_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.args_node))
         self.dot_body.append(s)
 
-        self.visit(node.stmts_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.stmts_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.stmts_node))
         self.dot_body.append(s)
 
-        self.visit(node.ret_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.ret_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.ret_node))
         self.dot_body.append(s)
 
+        return num
+
     def visit_Return(self, node):
         s = 'node{} [label="Return"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.type_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.type_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.type_node))
         self.dot_body.append(s)
 
-        self.visit(node.var_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.var_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.var_node))
         self.dot_body.append(s)
 
+        return num
+
     def visit_Cond(self, node):
         s = 'node{} [label="Cond"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.bool_expr)
-        s = 'node{} -> node{}\n'.format(node.num, node.bool_expr.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.bool_expr))
         self.dot_body.append(s)
 
-        self.visit(node.stmts_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.stmts_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.stmts_node))
         self.dot_body.append(s)
 
+        return num
+
     def visit_Loop(self, node):
         s = 'node{} [label="Loop"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.bool_expr)
-        s = 'node{} -> node{}\n'.format(node.num, node.bool_expr.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.bool_expr))
         self.dot_body.append(s)
 
-        self.visit(node.stmts_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.stmts_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.stmts_node))
         self.dot_body.append(s)
 
+        return num
+
     def visit_VarDecl(self, node):
         s = 'node{} [label="VarDecl"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.type_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.type_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.type_node))
         self.dot_body.append(s)
 
-        self.visit(node.var_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.var_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.var_node))
         self.dot_body.append(s)
 
+        return num
+
     def visit_Assign(self, node):
         s = 'node{} [label="Assign"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.var_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.var_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.var_node))
         self.dot_body.append(s)
 
-        self.visit(node.expr)
-        s = 'node{} -> node{}\n'.format(node.num, node.expr.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.expr))
         self.dot_body.append(s)
 
+        return num
+
     def visit_FunDecl(self, node):
         s = 'node{} [label="FunDecl: {}"]\n'.format(self.nodecount, node.fun_name)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.type_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.type_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.type_node))
         self.dot_body.append(s)
 
-        self.visit(node.args_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.args_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.args_node))
         self.dot_body.append(s)
 
-        self.visit(node.stmts_node)
-        s = 'node{} -> node{}\n'.format(node.num, node.stmts_node.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.stmts_node))
         self.dot_body.append(s)
 
+        return num
+
     def visit_Args(self, node):
         s = 'node{} [label="Args"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
         for child in node.args:
-            self.visit(child)
-            s = 'node{} -> node{}\n'.format(node.num, child.num)
+            s = 'node{} -> node{}\n'.format(num, self.visit(child))
             self.dot_body.append(s)
 
+        return num
+
     def visit_Stmts(self, node):
         s = 'node{} [label="Stmts"]\n'.format(self.nodecount)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
         for child in node.stmts:
-            self.visit(child)
-            s = 'node{} -> node{}\n'.format(node.num, child.num)
+            s = 'node{} -> node{}\n'.format(num, self.visit(child))
             self.dot_body.append(s)
 
+        return num
+
     def visit_Type(self, node):
         s = 'node{} [label="Type: {}"]\n'.format(self.nodecount, node.type)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
+        return num
+
     def visit_Var(self, node):
         s = 'node{} [label="Var: {}"]\n'.format(self.nodecount, node.var)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
+        return num
+
     def visit_String(self, node):
         s = 'node{} [label="String: {}"]\n'.format(self.nodecount, node.value)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
+        return num
+
     def visit_BinOp(self, node):
-        s = 'node{} [label="{}"]\n'.format(self.nodecount, node.op)
-        node.num = self.nodecount
-        self.nodecount += 1
-        self.dot_body.append(s)
+        # the left operands of a chain are numbered in a loop, in the order the nested calls would use
+        spine, left = left_spine(node)
+        nums = []
+        for binop in spine:
+            s = 'node{} [label="{}"]\n'.format(self.nodecount, binop.op)
+            nums.append(self.nodecount)
+            self.nodecount += 1
+            self.dot_body.append(s)
 
-        self.visit(node.left)
-        s = 'node{} -> node{}\n'.format(node.num, node.left.num)
-        self.dot_body.append(s)
+        left_num = self.visit(left)
+        for binop, num in zip(reversed(spine), reversed(nums)):
+            s = 'node{} -> node{}\n'.format(num, left_num)
+            self.dot_body.append(s)
 
-        self.visit(node.right)
-        s = 'node{} -> node{}\n'.format(node.num, node.right.num)
-        self.dot_body.append(s)
+            s = 'node{} -> node{}\n'.format(num, self.visit(binop.right))
+            self.dot_body.append(s)
+            left_num = num
+
+        return nums[0]
 
     def visit_UnOp(self, node):
         s = 'node{} [label="{}"]\n'.format(self.nodecount, node.token.type)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
-        self.visit(node.bool_expr)
-        s = 'node{} -> node{}\n'.format(node.num, node.bool_expr.num)
+        s = 'node{} -> node{}\n'.format(num, self.visit(node.bool_expr))
         self.dot_body.append(s)
 
+        return num
+
     def visit_Num(self, node):
         s = 'node{} [label="{}"]\n'.format(self.nodecount, node.value)
-        node.num = self.nodecount
+        num = self.nodecount
         self.nodecount += 1
         self.dot_body.append(s)
 
+        return num
+
     def genDot(self):
         tree = self.parser.parse()
         self.visit(tree)
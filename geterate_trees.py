@@ -1,31 +1,123 @@
+import argparse
+import fnmatch
 import os
-path = '.\examples'
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-print('PROCESSING...')
-for dir_name in os.listdir(path):
+import getastdot
+import getastpython
+from interpreter.compilation.cache import CompilationCache
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.syntax_analysis.parser import Parser
 
-    dot_pos = dir_name.find('.')
-    if dot_pos < 0 :
-        continue
+TARGETS = ('dot', 'python')
 
-    ext = dir_name[dot_pos+1:]
-    dir_name = dir_name[:dot_pos]
+# cache of the worker process, set by init_worker
+cache = None
 
-    dir_path = os.path.join(path, dir_name)
-    if not os.path.isdir(dir_path):
-        os.mkdir(dir_path)
 
-    dir_name = os.path.join(dir_path, dir_name)
+def init_worker(cache_dir, cache_size):
+    global cache
+    if cache_dir is not None:
+        cache = CompilationCache(cache_dir, getastpython.compiler_version(), cache_size)
 
-    input_filename = '{}.{}'.format(dir_path, ext)
-    dot_filename = '{}.dot'.format(dir_name)
-    png_filename = '{}.png'.format(dir_name)
 
-    os.system('python getastdot.py {} > {}'.format(
-        input_filename,
-        dot_filename
-    ))
+def find_sources(path, patterns):
+    sources = []
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if any(fnmatch.fnmatch(file_name, pattern) for pattern in patterns):
+                sources.append(os.path.join(dir_path, file_name))
+    return sources
 
 
-print('DONE')
+def output_path(source, path, output_dir, target):
+    """
+    DOT trees are written to <name>/<name>.dot next to the source, Python code to <name>_compiled.py.
+    With output_dir the directory structure below path is recreated there.
+    """
+    dir_name, file_name = os.path.split(source)
+    if output_dir is not None:
+        dir_name = os.path.normpath(os.path.join(output_dir, os.path.relpath(dir_name, path)))
+    name = os.path.splitext(file_name)[0]
 
+    if target == 'dot':
+        return os.path.join(dir_name, name, '{}.dot'.format(name))
+    return os.path.join(dir_name, '{}_compiled.py'.format(name))
+
+
+def compile_file(job):
+    """
+    Compiles one source in a worker process. Errors are returned, so one bad file does not stop the batch.
+    """
+    source, destination, target = job
+    start = time.perf_counter()
+    try:
+        with open(source, 'r') as f:
+            text = f.read()
+
+        if target == 'dot':
+            content = getastdot.ASTVisualizer(Parser(Lexer(text))).genDot()
+        else:
+            content = getastpython.compile_source(text, cache)
+
+        os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+        with open(destination, 'w') as out:
+            out.write(content)
+        error = None
+    except Exception as e:
+        error = '{}: {}'.format(type(e).__name__, e)
+
+    return source, destination, time.perf_counter() - start, error
+
+
+def compile_all(sources, path, target, workers, output_dir=None, cache_dir=None, cache_size=64 * 1024 * 1024):
+    jobs = [(source, output_path(source, path, output_dir, target), target) for source in sources]
+    # several files per task keep the scheduling overhead low for large batches of small files
+    chunk_size = max(1, len(jobs) // (workers * 8))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(cache_dir, cache_size)) as executor:
+        return list(executor.map(compile_file, jobs, chunksize=chunk_size))
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compiles all nonek sources in a directory tree in parallel.')
+    argparser.add_argument('path', nargs='?', default='examples')
+    argparser.add_argument('-t', '--target', choices=TARGETS, default='dot')
+    argparser.add_argument('-p', '--pattern', action='append', help='file name pattern of sources (default *.txt)')
+    argparser.add_argument('-o', '--output-dir', help='directory for outputs instead of next to the sources')
+    argparser.add_argument('-j', '--workers', type=int, default=os.cpu_count())
+    argparser.add_argument('--no-cache', action='store_true', help='do not use the compilation cache')
+    argparser.add_argument('--cache-dir', default=os.path.join(getastpython.ROOT, '.nonek_cache'))
+    argparser.add_argument('--cache-size', type=int, default=64, help='maximum size of the cache in MB')
+    argparser.add_argument('-q', '--quiet', action='store_true', help='print only failures and the summary')
+    args = argparser.parse_args()
+
+    sources = find_sources(args.path, args.pattern or ['*.txt'])
+    cache_dir = None if args.no_cache or args.target != 'python' else args.cache_dir
+
+    print('PROCESSING {} files with {} workers...'.format(len(sources), args.workers))
+    start = time.perf_counter()
+    results = compile_all(sources, args.path, args.target, args.workers, args.output_dir, cache_dir,
+                          args.cache_size * 1024 * 1024)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for source, destination, seconds, error in results:
+        if error is not None:
+            failed += 1
+            print('FAILED {:>9.4f}s {}\n    {}'.format(seconds, source, error))
+        elif not args.quiet:
+            print('ok     {:>9.4f}s {} -> {}'.format(seconds, source, destination))
+
+    compile_time = sum(result[2] for result in results)
+    print('DONE: {} compiled, {} failed, wall {:.3f}s, compile time {:.3f}s, speedup {:.2f}x'
+          .format(len(results) - failed, failed, elapsed, compile_time, compile_time / elapsed if elapsed else 0))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
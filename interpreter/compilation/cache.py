@@ -0,0 +1,109 @@
+import hashlib
+import os
+import pickle
+
+from interpreter.syntax_analysis.arena import Arena
+
+CODE_SUFFIX = '.py'
+TREE_SUFFIX = '.ast'
+
+
+class CompilationCache(object):
+    """
+    On disk cache of compiler output keyed by the hash of the compiler version and the source text.
+
+    Every entry is the generated code and optionally the syntax tree, pickled as an Arena. Reading an entry
+    refreshes its modification time, and after every write the least recently used entries are removed until
+    the directory is not bigger than max_size bytes.
+    """
+
+    def __init__(self, directory, version, max_size=64 * 1024 * 1024):
+        self.directory = directory
+        self.version = version
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source, options=''):
+        """
+        options tell apart entries compiled from the same source with different settings, like the -O level.
+        """
+        return hashlib.sha256('{}\0{}\0{}'.format(self.version, options, source).encode('utf-8')).hexdigest()
+
+    def path(self, source, suffix, options=''):
+        return os.path.join(self.directory, self.key(source, options) + suffix)
+
+    def read(self, path, mode):
+        try:
+            with open(path, mode) as f:
+                content = f.read()
+            os.utime(path)
+        except OSError:
+            # missing or just evicted by another process
+            return None
+        return content
+
+    def get(self, source, options=''):
+        """
+        Returns the cached code for the source or None.
+        """
+        return self.read(self.path(source, CODE_SUFFIX, options), 'r')
+
+    def get_tree(self, source, options=''):
+        """
+        Returns the cached syntax tree for the source or None.
+        """
+        content = self.read(self.path(source, TREE_SUFFIX, options), 'rb')
+        return None if content is None else pickle.loads(content).to_tree()
+
+    def write(self, path, content, mode):
+        # other compilers can read the directory at the same time, so the entry appears atomically
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, mode) as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def put(self, source, code, tree=None, options=''):
+        self.write(self.path(source, CODE_SUFFIX, options), code, 'w')
+        if tree is not None:
+            content = pickle.dumps(Arena.from_tree(tree), pickle.HIGHEST_PROTOCOL)
+            self.write(self.path(source, TREE_SUFFIX, options), content, 'wb')
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.endswith('.tmp'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                os.remove(entry.path)
+
+
+def compiler_fingerprint(version, paths):
+    """
+    Version string for cache keys: the compiler version and the hash of the compiler sources, so entries made
+    by a modified compiler are never reused.
+    """
+    digest = hashlib.sha256(version.encode('utf-8'))
+    for path in sorted(paths):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return '{}-{}'.format(version, digest.hexdigest()[:16])
@@ -0,0 +1,56 @@
+import marshal
+import os
+try:
+    # importlib.util gives the same number, but imports contextlib and more at every start of the launcher
+    from importlib._bootstrap_external import MAGIC_NUMBER
+except ImportError:
+    # the private module is not there on every implementation, the public one is
+    from importlib.util import MAGIC_NUMBER
+
+CODE_FILE_SUFFIX = '.pyc'
+# PEP 552 flags of a hash based .pyc whose hash Python does not check, the field holds the nonek source hash
+FLAGS = (1).to_bytes(4, 'little')
+HEADER_SIZE = 16
+
+
+def source_key(text):
+    # hashlib loads OpenSSL, only checked launches and the compiler pay for it
+    import hashlib
+    return hashlib.sha256(text.encode('utf-8')).digest()[:8]
+
+
+def code_path(output):
+    return os.path.splitext(output)[0] + CODE_FILE_SUFFIX
+
+
+def dump_code(code, text):
+    """
+    Returns the .pyc content of the code object compiled from the nonek source text: the magic number of the
+    running Python, the flags, the hash of the source and the marshalled code. Python runs it directly too.
+    """
+    return MAGIC_NUMBER + FLAGS + source_key(text) + marshal.dumps(code)
+
+
+def write_code(path, code, text):
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(dump_code(code, text))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_code(path, text=None):
+    """
+    Returns the code object of a .pyc written by write_code. It must come from this Python version and, when
+    the nonek source text is given, from that source.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != MAGIC_NUMBER:
+        raise Exception('{} was not written by this Python version, compile it again.'.format(path))
+    if text is not None and data[8:HEADER_SIZE] != source_key(text):
+        raise Exception('{} is out of date, compile it again.'.format(path))
+    return marshal.loads(memoryview(data)[HEADER_SIZE:])
@@ -0,0 +1,24 @@
+class Emitter(object):
+    """
+    Writes generated code to a file-like sink. Fragments are collected with write, a plain list append, and
+    the code generator calls flush after every statement, so only the current statement is held in memory.
+    The indentation string of every depth is built once.
+    """
+
+    def __init__(self, sink, indent_unit='\t'):
+        self.sink = sink
+        self.fragments = []
+        self.write = self.fragments.append
+        self.indents = ['']
+        self.indent_unit = indent_unit
+
+    def indent(self, depth):
+        indents = self.indents
+        while len(indents) <= depth:
+            indents.append(indents[-1] + self.indent_unit)
+        return indents[depth]
+
+    def flush(self):
+        if self.fragments:
+            self.sink.write(''.join(self.fragments))
+            self.fragments.clear()
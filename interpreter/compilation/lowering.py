@@ -0,0 +1,72 @@
+import ast
+
+from interpreter.lexical_analysis.tokenType import EQUAL, NOT_EQUAL
+from interpreter.syntax_analysis.interpreter import FunCall, FunImpl, Library, Num
+
+# code generation rules shared by the source (getastpython) and ast (python_ast) backends, string literals are
+# decoded the same way by the VM compiler
+
+INTERPUNCTION = (',', '.', ':', '?', '!', ';')
+STRING_PREDICATES = frozenset(('isDigit', 'isLetter', 'isSpace', 'isInterpunction'))
+# callables of the generated code bound to locals of __nonek_main__ once, so calls in its loops do not look
+# them up in the module and builtins dicts
+MAIN_LOCALS = {
+    'int': '__nonek_int',
+    'input': '__nonek_input',
+    'print': '__nonek_print',
+    'len': '__nonek_len',
+    'str': '__nonek_str',
+    'open': '__nonek_open',
+    'random.randrange': '__nonek_randrange',
+    'math.sqrt': '__nonek_sqrt',
+    'math.ceil': '__nonek_ceil',
+    'math.floor': '__nonek_floor',
+    'float.is_integer': '__nonek_is_integer',
+    '__nonek_range__': '__nonek_range',
+    '__nonek_max__': '__nonek_max',
+    '__nonek_min__': '__nonek_min',
+}
+# builtins the lowered counted loops call, bound at module level under private names, as a nonek variable can
+# be named range, max or min
+LOOP_BUILTINS = {'range': '__nonek_range__', 'max': '__nonek_max__', 'min': '__nonek_min__'}
+
+
+def string_value(text):
+    """
+    Returns the value of a nonek string literal. The source backend writes the text between quotes, so the
+    Python escapes in it are interpreted.
+    """
+    if '\\' in text:
+        return ast.literal_eval('\'{}\''.format(text))
+    return text
+
+
+def predicate_test(node):
+    """
+    Returns (call, truth) for a comparison of a String predicate call with the literal 0 or 1, where truth
+    tells if the comparison holds when the predicate does, otherwise None.
+    """
+    if node.op.type not in (EQUAL, NOT_EQUAL):
+        return None
+    call, literal = node.left, node.right
+    if isinstance(literal, FunCall):
+        call, literal = literal, call
+    if not (isinstance(call, FunCall) and call.lib_name == 'String' and call.fun_name in STRING_PREDICATES
+            and isinstance(literal, Num) and type(literal.value) is int and literal.value in (0, 1)):
+        return None
+    return call, (literal.value == 1) == (node.op.type == EQUAL)
+
+
+def is_execution(node):
+    return not isinstance(node, (Library, FunImpl))
+
+
+def wraps_main(children):
+    # the Execution statements go into __nonek_main__ when no library or function follows them
+    seen = False
+    for child in children:
+        if is_execution(child):
+            seen = True
+        elif seen:
+            return False
+    return seen
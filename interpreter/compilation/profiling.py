@@ -0,0 +1,134 @@
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+from interpreter.lexical_analysis.token import Token
+from interpreter.lexical_analysis.tokenStream import TokenStream
+from interpreter.syntax_analysis.arena import NODE_CLASSES, Arena
+
+FORMATS = ('text', 'json')
+# a token kept for a restorable scan costs the object and its slots in the buffer and lines lists
+TOKEN_BYTES = sys.getsizeof(Token(None, None)) + 2 * tuple.__itemsize__
+
+
+class Phase(object):
+    """
+    Metrics of one compiler phase: wall time in seconds, peak memory in bytes allocated above what was
+    allocated when it started (None when not measured) and named counts, like tokens or nodes per class.
+    """
+    __slots__ = ('name', 'seconds', 'peak_memory', 'counts')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.peak_memory = None
+        self.counts = {}
+
+    def as_dict(self):
+        return {'name': self.name, 'seconds': self.seconds, 'peak_memory': self.peak_memory, 'counts': self.counts}
+
+
+class Profiler(object):
+    """
+    Times the phases run inside phase(name) blocks, with their memory measured by tracemalloc too when memory
+    is set. Counts are added to the yielded Phase after the block, so computing them is not timed, and then
+    done passes the Phase to the hooks. peaks, the peak memory of every phase measured by an earlier run,
+    are given to the phases in order.
+    """
+
+    def __init__(self, memory=False, hooks=(), peaks=None):
+        self.memory = memory
+        self.hooks = hooks
+        self.peaks = peaks
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        phase = Phase(name)
+        if self.memory:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield phase
+        phase.seconds = time.perf_counter() - start
+        if self.memory:
+            phase.peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+        self.phases.append(phase)
+
+    def done(self, phase):
+        if self.peaks is not None:
+            phase.peak_memory = self.peaks[len(self.phases) - 1]
+        for hook in self.hooks:
+            hook(phase)
+
+    @contextmanager
+    def tracing(self):
+        if not self.memory or tracemalloc.is_tracing():
+            yield
+            return
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            tracemalloc.stop()
+
+
+class CountingTokenStream(TokenStream):
+    """
+    Token stream counting the marks taken by restorable parser methods and the tokens they scan before
+    resetting. A lazily lexed stream keeps those tokens buffered until the reset.
+    """
+
+    def __init__(self, lexer, tokens=None, lines=None):
+        self.snapshots = 0
+        self.snapshot_tokens = 0
+        self.max_snapshot_tokens = 0
+        super().__init__(lexer, tokens, lines)
+
+    def mark(self):
+        self.snapshots += 1
+        return super().mark()
+
+    def reset(self, mark):
+        # restorable scans only move forward, so the position is the furthest token reached
+        scanned = self.pos - mark + 1
+        self.snapshot_tokens += scanned
+        if scanned > self.max_snapshot_tokens:
+            self.max_snapshot_tokens = scanned
+        return super().reset(mark)
+
+    def counts(self):
+        return {
+            'snapshots': self.snapshots,
+            'snapshot_tokens': self.snapshot_tokens,
+            'snapshot_bytes': self.snapshot_tokens * TOKEN_BYTES,
+            'max_snapshot_bytes': self.max_snapshot_tokens * TOKEN_BYTES,
+        }
+
+
+def node_counts(tree):
+    """
+    Returns the number of nodes of the tree per class name, most frequent first.
+    """
+    kinds = Counter(Arena.from_tree(tree).kinds)
+    return {NODE_CLASSES[kind].__name__: count for kind, count in kinds.most_common()}
+
+
+def format_phases(phases, format='text'):
+    if format == 'json':
+        return json.dumps({'phases': [phase.as_dict() for phase in phases]}, indent=2) + '\n'
+
+    lines = ['{:<10} {:>10} {:>12}'.format('phase', 'ms', 'peak KiB')]
+    for phase in phases:
+        memory = '-' if phase.peak_memory is None else '{:.1f}'.format(phase.peak_memory / 1024)
+        lines.append('{:<10} {:>10.2f} {:>12}'.format(phase.name, phase.seconds * 1000, memory))
+        for name, count in phase.counts.items():
+            if isinstance(count, dict):
+                count = ', '.join('{} {}'.format(key, value) for key, value in count.items())
+            lines.append('    {}: {}'.format(name, count))
+    total = sum(phase.seconds for phase in phases)
+    lines.append('{:<10} {:>10.2f}'.format('total', total * 1000))
+    return '\n'.join(lines) + '\n'
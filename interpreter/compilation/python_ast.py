@@ -0,0 +1,390 @@
+import ast
+
+from interpreter.compilation.lowering import (
+    INTERPUNCTION, LOOP_BUILTINS, MAIN_LOCALS, STRING_PREDICATES, is_execution, predicate_test, string_value,
+    wraps_main,
+)
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.lexical_analysis.tokenType import *
+from interpreter.optimization import optimizer
+from interpreter.optimization.optimizer import COUNTED_LOOPS, int_expression
+from interpreter.semantic_analysis.analyzer import analyze, is_variable
+from interpreter.syntax_analysis.interpreter import FunCall, NodeVisitor, Num, Var, left_spine
+from interpreter.syntax_analysis.parser import Parser
+
+# operator nodes carry no position, so one instance of each is shared like ast.parse does
+ARITHMETIC_OPS = {
+    PLUS: ast.Add(), MINUS: ast.Sub(), MUL: ast.Mult(), NDIV: ast.Div(), DIV: ast.FloorDiv(), MOD: ast.Mod(),
+}
+COMPARISON_OPS = {
+    LESS: ast.Lt(), LESS_EQ: ast.LtE(), GREATER: ast.Gt(), GREATER_EQ: ast.GtE(), EQUAL: ast.Eq(),
+    NOT_EQUAL: ast.NotEq(),
+}
+LOGICAL_OPS = {AND: ast.And(), OR: ast.Or()}
+# String predicates calling a str method of their argument, isInterpunction is a membership test
+PREDICATE_METHODS = {'isDigit': 'isdigit', 'isLetter': 'isalpha', 'isSpace': 'isspace'}
+# library functions generating a statement, the others are expressions
+STATEMENT_FUNCTIONS = frozenset((('Stdio', 'out'), ('String', 'append'), ('Arrays', 'init'), ('Arrays', 'append')))
+
+LOAD = ast.Load()
+STORE = ast.Store()
+NOT_OP = ast.Not()
+MINUS_OP = ast.USub()
+IN_OP = ast.In()
+
+
+def same_chain(parent, left):
+    # an and/or chain ends at another operator, the operands of arithmetic are never and/or
+    if parent.op.type in LOGICAL_OPS:
+        return left.op.type == parent.op.type
+    return left.op.type not in LOGICAL_OPS
+
+
+class PythonASTBuilder(NodeVisitor):
+    """
+    Code generator building the ast.Module of a checked (and optimized) nonek tree, the same program the
+    text of getastpython is parsed to. Statement nodes add their Python statements to the block being
+    built, expression nodes return theirs. Every Python node is given the line of the nonek statement it
+    is built for when it is created, as compile() needs positions and fix_missing_locations would walk
+    the whole module again.
+    """
+
+    def __init__(self, analysis, optimize=0):
+        self.analysis = analysis
+        self.optimize = optimize
+        self.block = None
+        self.line = 1
+        # names the code calls the Python callables by, the locals of __nonek_main__ inside it
+        self.callables = {}
+        # counted loops the code being built is in, every one keeps its end in a temporary of its own
+        self.loop_depth = 0
+
+    def build(self, tree):
+        self.block = [self.import_module('random'), self.import_module('math')]
+        if self.optimize:
+            frozenset_call = self.call(self.name('frozenset'), [self.constant(INTERPUNCTION)])
+            self.add(ast.Assign, targets=[self.name('__nonek_interpunction__', STORE)], value=frozenset_call)
+            for name, alias in LOOP_BUILTINS.items():
+                self.add(ast.Assign, targets=[self.name(alias, STORE)], value=self.name(name))
+        self.visit(tree)
+        return ast.Module(body=self.block, type_ignores=[])
+
+    def node(self, cls, **fields):
+        return cls(lineno=self.line, col_offset=0, **fields)
+
+    def add(self, cls, **fields):
+        self.block.append(self.node(cls, **fields))
+
+    def import_module(self, module):
+        return self.node(ast.Import, names=[self.node(ast.alias, name=module)])
+
+    def statements(self, nodes):
+        """
+        Returns the Python statements of the nonek statements, pass when there are none.
+        """
+        outer, self.block = self.block, []
+        for node in nodes:
+            self.statement(node)
+        block, self.block = self.block, outer
+        return block or [self.node(ast.Pass)]
+
+    def statement(self, node):
+        self.line = node.line_number
+        if isinstance(node, FunCall) and (node.lib_name, node.fun_name) not in STATEMENT_FUNCTIONS:
+            self.add(ast.Expr, value=self.visit(node))
+        else:
+            self.visit(node)
+
+    def function_def(self, fun_name, arg_names, body):
+        args = [self.node(ast.arg, arg=arg_name) for arg_name in arg_names]
+        arguments = ast.arguments(posonlyargs=[], args=args, kwonlyargs=[], kw_defaults=[], defaults=[])
+        fields = dict(name=fun_name, args=arguments, body=body, decorator_list=[], returns=None)
+        if 'type_params' in ast.FunctionDef._fields:
+            fields['type_params'] = []
+        self.add(ast.FunctionDef, **fields)
+
+    # the nodes built most often get their fields by position, which ast classes take about twice as fast
+
+    def name(self, id, ctx=LOAD):
+        return ast.Name(id, ctx, lineno=self.line, col_offset=0)
+
+    def attribute(self, value, attr):
+        return ast.Attribute(value, attr, LOAD, lineno=self.line, col_offset=0)
+
+    def call(self, func, args):
+        return ast.Call(func, args, [], lineno=self.line, col_offset=0)
+
+    def dotted(self, path):
+        names = path.split('.')
+        node = self.name(names[0])
+        for attr in names[1:]:
+            node = self.attribute(node, attr)
+        return node
+
+    def callable(self, path):
+        local = self.callables.get(path)
+        return self.dotted(path) if local is None else self.name(local)
+
+    def constant(self, value):
+        # the source backend writes numbers with str, a negative one is read back as a unary minus
+        if str(value).startswith('-'):
+            return ast.UnaryOp(MINUS_OP, self.constant(-value), lineno=self.line, col_offset=0)
+        return ast.Constant(value, lineno=self.line, col_offset=0)
+
+    def string(self, value):
+        return ast.Constant(string_value(value), lineno=self.line, col_offset=0)
+
+    def visit_Program(self, node):
+        main = None
+        if self.optimize and wraps_main(node.children):
+            main = []
+        for child in node.children:
+            if main is not None and is_execution(child) and not self.callables:
+                main_line = self.line = child.line_number
+                module, self.block = self.block, main
+                for path, local in MAIN_LOCALS.items():
+                    self.add(ast.Assign, targets=[self.name(local, STORE)], value=self.dotted(path))
+                self.callables = MAIN_LOCALS
+            self.statement(child)
+
+        if main is not None:
+            self.block = module
+            self.callables = {}
+            self.line = main_line
+            self.function_def('__nonek_main__', [], main)
+            test = self.node(ast.Compare, left=self.name('__name__'), ops=[COMPARISON_OPS[EQUAL]],
+                             comparators=[self.constant('__main__')])
+            entry = self.node(ast.Expr, value=self.call(self.name('__nonek_main__'), []))
+            self.add(ast.If, test=test, body=[entry], orelse=[])
+
+    def visit_Library(self, node):
+        pass
+
+    def visit_FunImpl(self, node):
+        body = self.statements(node.stmts_node.stmts) if node.stmts_node.stmts else []
+        self.line = node.ret_node.line_number
+        body.append(self.node(ast.Return, value=self.visit(node.ret_node.var_node)))
+        self.line = node.line_number
+        self.function_def(node.fun_name, [child.var_node.var for child in node.args_node.args], body)
+
+    def visit_Cond(self, node):
+        test = self.visit(node.bool_expr)
+        self.add(ast.If, test=test, body=self.body(node), orelse=[])
+
+    def visit_Loop(self, node):
+        test = self.visit(node.bool_expr)
+        self.add(ast.While, test=test, body=self.body(node), orelse=[])
+
+    def body(self, node):
+        # the statement is added after its body is built, with its own line
+        body = self.statements(node.stmts_node.stmts)
+        self.line = node.line_number
+        return body
+
+    def visit_CountedLoop(self, node):
+        var = node.var_node.var[1:]
+        rounding, offset, step = COUNTED_LOOPS[node.op.type]
+        end = self.loop_end(node.bound, rounding, offset)
+        args = [self.name(var), end]
+        if step < 0:
+            args.append(self.constant(-1))
+        # the while loop leaves the variable at the end of the range, unless it did not run at all
+        last = self.call(self.callable(LOOP_BUILTINS['max' if step > 0 else 'min']), [self.name(var), end])
+
+        self.loop_depth += 1
+        body = self.body(node)
+        self.loop_depth -= 1
+        self.add(ast.For, target=self.name(var, STORE), iter=self.call(self.callable(LOOP_BUILTINS['range']), args), body=body,
+                 orelse=[])
+        self.add(ast.Assign, targets=[self.name(var, STORE)], value=last)
+
+    def loop_end(self, bound, rounding, offset):
+        """
+        Returns the end of the range of a counted loop, the bound rounded when it can be a float and moved by
+        offset. An end other than a literal or a variable is computed once before the loop into a temporary.
+        """
+        if isinstance(bound, Num) and isinstance(bound.value, int):
+            return self.constant(bound.value + offset)
+        int_bound = int_expression(bound, self.analysis)
+        end = self.visit(bound)
+        if int_bound and not offset and isinstance(bound, Var):
+            return end
+        if not int_bound:
+            end = self.call(self.callable('math.' + rounding), [end])
+        if offset:
+            op = ARITHMETIC_OPS[PLUS if offset > 0 else MINUS]
+            end = self.node(ast.BinOp, left=end, op=op, right=self.constant(abs(offset)))
+        temporary = '__nonek_end{}'.format(self.loop_depth)
+        self.add(ast.Assign, targets=[self.name(temporary, STORE)], value=end)
+        return self.name(temporary)
+
+    def visit_VarDecl(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        value = self.visit(node.expr)
+        if not self.optimize and self.analysis.type_of(node.var_node) == 'INT' and isinstance(node.expr, Num):
+            value = self.call(self.name('int'), [value])
+        self.add(ast.Assign, targets=[self.name(node.var_node.var[1:], STORE)], value=value)
+
+    def visit_FunCall(self, node):
+        lib_name, fun_name = node.lib_name, node.fun_name
+        args = node.args_nodes
+
+        if lib_name == 'This':
+            return self.call(self.name(fun_name), [self.visit(child) for child in args])
+
+        if lib_name == 'Stdio':
+            if fun_name == 'out':
+                self.add(ast.Expr, value=self.call(self.callable('print'), [self.visit(args[0])]))
+                return None
+            elif fun_name == 'inINT':
+                return self.call(self.callable('int'), [self.call(self.callable('input'), [])])
+            elif fun_name == 'inSTRING':
+                return self.call(self.callable('input'), [])
+
+        elif lib_name == 'String':
+            if fun_name == 'append':
+                value = self.node(ast.BinOp, left=self.visit(args[0]), op=ARITHMETIC_OPS[PLUS],
+                                  right=self.visit(args[1]))
+                self.add(ast.Assign, targets=[self.name(args[0].var[1:], STORE)], value=value)
+                return None
+            elif fun_name in ('equals', 'notEqual'):
+                op = COMPARISON_OPS[EQUAL if fun_name == 'equals' else NOT_EQUAL]
+                return self.node(ast.Compare, left=self.visit(args[0]), ops=[op], comparators=[self.visit(args[1])])
+            elif fun_name == 'size':
+                return self.call(self.callable('len'), [self.visit(args[0])])
+            elif fun_name == 'get':
+                return self.node(ast.Subscript, value=self.visit(args[0]), slice=self.int_arg(args[1]), ctx=LOAD)
+            elif fun_name == 'substring':
+                index = self.node(ast.Slice, lower=self.visit(args[1]), upper=self.visit(args[2]))
+                return self.node(ast.Subscript, value=self.visit(args[0]), slice=index, ctx=LOAD)
+            elif fun_name == 'toUpper':
+                return self.call(self.attribute(self.visit(args[0]), 'upper'), [])
+            elif fun_name in STRING_PREDICATES:
+                return self.call(self.callable('int'), [self.predicate(node)])
+
+        elif lib_name == 'Random':
+            if fun_name == 'range':
+                return self.call(self.callable('random.randrange'), [self.int_arg(args[0]), self.int_arg(args[1])])
+
+        elif lib_name == 'Math':
+            if fun_name == 'sqrt':
+                return self.call(self.callable('math.sqrt'), [self.visit(args[0])])
+
+        elif lib_name == 'Arrays':
+            if fun_name == 'init':
+                value = self.node(ast.List, elts=[], ctx=LOAD)
+                self.add(ast.Assign, targets=[self.name(args[0].var[1:], STORE)], value=value)
+                return None
+            elif fun_name == 'append':
+                append = self.call(self.attribute(self.visit(args[0]), 'append'), [self.visit(args[1])])
+                self.add(ast.Expr, value=append)
+                return None
+            elif fun_name == 'size':
+                return self.call(self.callable('len'), [self.visit(args[0])])
+            elif fun_name == 'get':
+                return self.node(ast.Subscript, value=self.visit(args[0]), slice=self.int_arg(args[1]), ctx=LOAD)
+
+        elif lib_name == 'Number':
+            if fun_name == 'isInteger':
+                return self.call(self.callable('float.is_integer'), [self.visit(args[0])])
+            elif fun_name == 'toString':
+                return self.call(self.callable('str'), [self.visit(args[0])])
+
+        elif lib_name == 'FileUtil':
+            if fun_name == 'read':
+                file = self.call(self.callable('open'), [self.visit(args[0]), self.constant('r')])
+                return self.call(self.attribute(file, 'read'), [])
+
+        raise Exception('Function {}.{} does not exist.\nLine: {}'.format(lib_name, fun_name, node.line_number))
+
+    def int_arg(self, node):
+        # int() is left out for int literals and variables the optimizer found to always hold an int
+        if self.optimize and isinstance(node.var, int):
+            return self.constant(node.var)
+        elif self.optimize and self.analysis.is_int(node):
+            return self.visit(node)
+        return self.call(self.callable('int'), [self.visit(node)])
+
+    def predicate(self, node):
+        arg = self.visit(node.args_nodes[0])
+        if node.fun_name in PREDICATE_METHODS:
+            return self.call(self.attribute(arg, PREDICATE_METHODS[node.fun_name]), [])
+        if self.optimize:
+            characters = self.name('__nonek_interpunction__')
+        else:
+            characters = self.node(ast.List, elts=[self.constant(c) for c in INTERPUNCTION], ctx=LOAD)
+        return self.node(ast.Compare, left=arg, ops=[IN_OP], comparators=[characters])
+
+    def visit_Var(self, node):
+        if is_variable(node):
+            return self.name(node.var[1:])
+        # value is string
+        return self.string(str(node.var))
+
+    def visit_String(self, node):
+        return self.string(node.value)
+
+    def visit_Num(self, node):
+        return self.constant(node.value)
+
+    def visit_UnOp(self, node):
+        op = NOT_OP if node.token.type == NOT else MINUS_OP
+        return ast.UnaryOp(op, self.visit(node.bool_expr), lineno=self.line, col_offset=0)
+
+    def visit_BinOp(self, node):
+        test = predicate_test(node) if self.optimize else None
+        if test is not None:
+            # int(predicate) == 1 is the predicate itself
+            predicate_call, truth = test
+            predicate = self.predicate(predicate_call)
+            return predicate if truth else self.node(ast.UnaryOp, op=NOT_OP, operand=predicate)
+
+        # and/or chains are one BoolOp, as Python reads the single pair of parentheses they are written in
+        spine, left = left_spine(node, same_chain)
+        if node.op.type in LOGICAL_OPS:
+            values = [self.visit(left)] + [self.visit(binop.right) for binop in reversed(spine)]
+            return self.node(ast.BoolOp, op=LOGICAL_OPS[node.op.type], values=values)
+
+        result = self.visit(left)
+        line = self.line
+        for binop in reversed(spine):
+            right = self.visit(binop.right)
+            op = binop.op.type
+            if op in COMPARISON_OPS:
+                result = ast.Compare(result, [COMPARISON_OPS[op]], [right], lineno=line, col_offset=0)
+            else:
+                result = ast.BinOp(result, ARITHMETIC_OPS[op], right, lineno=line, col_offset=0)
+        return result
+
+
+def checked_tree(text, optimize=0):
+    """
+    Returns the tree of nonek source, checked and optimized at the -O level, with its Analysis.
+    """
+    tree = Parser(Lexer(text)).parse()
+    analysis = analyze(tree)
+    return optimizer.optimize(tree, analysis, optimize), analysis
+
+
+def build_module(tree, analysis, optimize=0):
+    """
+    Returns the ast.Module of a tree checked by analyze and optimized at the -O level.
+    """
+    return PythonASTBuilder(analysis, optimize).build(tree)
+
+
+def compile_module(text, optimize=0, filename='<nonek>'):
+    """
+    Compiles nonek source straight to a Python code object, without generating Python source.
+    """
+    tree, analysis = checked_tree(text, optimize)
+    return compile(build_module(tree, analysis, optimize), filename, 'exec')
+
+
+def unparse(module):
+    """
+    Returns the Python source of a built module, only needed when the code is to be read or written out.
+    """
+    return ast.unparse(module) + '\n'
@@ -0,0 +1,533 @@
+import io
+import textwrap
+
+from interpreter.compilation import profiling, python_ast
+from interpreter.compilation.emitter import Emitter
+from interpreter.compilation.lowering import (
+    INTERPUNCTION, LOOP_BUILTINS, MAIN_LOCALS, is_execution, predicate_test, wraps_main,
+)
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.syntax_analysis.interpreter import NodeVisitor, Num, Var, left_spine
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.lexical_analysis.tokenType import NOT, PRECEDENCE
+from interpreter.optimization.optimizer import COUNTED_LOOPS, int_expression, optimize
+from interpreter.semantic_analysis.analyzer import analyze, is_variable
+
+# String predicates as the Python test written after their argument, giving a bool
+PREDICATE_TESTS = {
+    'isDigit': '.isdigit()',
+    'isLetter': '.isalpha()',
+    'isSpace': '.isspace()',
+    'isInterpunction': ' in {}'.format(list(INTERPUNCTION)),
+}
+OPTIMIZED_PREDICATES = dict(PREDICATE_TESTS, isInterpunction=' in __nonek_interpunction__')
+
+
+def same_level(parent, left):
+    # left operands of the same operator or precedence level need no parentheses of their own
+    return left.op.type == parent.op.type or PRECEDENCE.get(left.op.type, -1) == PRECEDENCE.get(parent.op.type)
+
+
+class ASTVisualizer(NodeVisitor):
+    def __init__(self, parser, out=None, optimize=0):
+        """
+        The generated code is streamed to the file-like out, when it is None genDot returns it as a string.
+        optimize is the -O level of the optimization pass run on the tree before code generation.
+        """
+        self.num_tabs = 0
+        self.parser = parser
+        self.out = out
+        self.optimize = optimize
+        # expression written without its outer parentheses
+        self.bare = None
+        self.emitter = Emitter(io.StringIO() if out is None else out)
+        self.emit = self.emitter.write
+        self.dot_heder = [textwrap.dedent("""
+            ### nonek ###
+            
+            import random
+            import math
+            
+        """)]
+        self.predicates = PREDICATE_TESTS
+        if optimize:
+            # the interpunction test looks up one set instead of building and scanning a list every call
+            self.dot_heder.append('__nonek_interpunction__ = frozenset({})\n'.format(INTERPUNCTION))
+            self.dot_heder.extend('{} = {}\n'.format(alias, name) for name, alias in LOOP_BUILTINS.items())
+            self.dot_heder.append('\n')
+            self.predicates = OPTIMIZED_PREDICATES
+        # names the code calls the Python callables by, the locals of __nonek_main__ inside it
+        self.callables = {}
+        # counted loops the code being generated is in, every one keeps its end in a temporary of its own
+        self.loop_depth = 0
+        self.dot_footer = []
+        # symbols and types resolved by the semantic analysis, set by genDot
+        self.analysis = None
+
+    def tabs(self):
+        return self.emitter.indent(self.num_tabs)
+
+    def callable(self, name):
+        return self.callables.get(name, name)
+
+    def visit_Program(self, node):
+        # with -O the Execution statements are the body of a function, so their variables are fast locals
+        main = self.optimize and wraps_main(node.children)
+        for child in node.children:
+            if main and not self.callables and is_execution(child):
+                self.start_main()
+            self.visit(child)
+            self.emitter.flush()
+        if main:
+            self.end_main()
+
+    def start_main(self):
+        self.emit('\n\ndef __nonek_main__():')
+        self.num_tabs += 1
+        for name, local in MAIN_LOCALS.items():
+            self.emit('\n{}{} = {}'.format(self.tabs(), local, name))
+        self.emit('\n')
+        self.callables = MAIN_LOCALS
+
+    def end_main(self):
+        self.callables = {}
+        self.num_tabs -= 1
+        self.emit('\n\n\nif __name__ == \'__main__\':\n{}__nonek_main__()\n'.format(self.emitter.indent(1)))
+        self.emitter.flush()
+
+    def visit_Library(self, node):
+        pass
+
+    def visit_FunCall(self, node):
+        if node.lib_name == 'Stdio':
+            if node.fun_name == 'inINT':
+                s = '{}({}())'.format(self.callable('int'), self.callable('input'))
+                self.emit(s)
+            elif node.fun_name == 'inSTRING':
+                s = '{}()'.format(self.callable('input'))
+                self.emit(s)
+            elif node.fun_name == 'out':
+                s = '\n{}{}('.format(self.tabs(), self.callable('print'))
+                self.emit(s)
+                self.visit(node.args_nodes[0])
+                s = ')'
+                self.emit(s)
+
+        elif node.lib_name == 'String':
+            if node.fun_name == 'equals':
+                self.visit(node.args_nodes[0])
+                self.emit(' == ')
+                self.visit(node.args_nodes[1])
+
+            elif node.fun_name == 'append':
+                self.emit('\n{}'.format(self.tabs()))
+                self.visit(node.args_nodes[0])
+                self.emit(' = ')
+                self.visit(node.args_nodes[0])
+                self.emit(' + ')
+                self.visit(node.args_nodes[1])
+
+            elif node.fun_name == 'size':
+                self.emit(self.callable('len') + '(')
+                self.visit(node.args_nodes[0])
+                self.emit(')')
+
+            elif node.fun_name == 'get':
+                self.visit(node.args_nodes[0])
+                self.emit('[')
+                self.int_arg(node.args_nodes[1])
+                self.emit(']')
+
+            elif node.fun_name == 'notEqual':
+                self.visit(node.args_nodes[0])
+                self.emit(' != ')
+                self.visit(node.args_nodes[1])
+
+            elif node.fun_name in PREDICATE_TESTS:
+                self.emit(self.callable('int') + '(')
+                self.predicate(node)
+                self.emit(')')
+
+            elif node.fun_name == 'substring':
+                self.emit('')
+                self.visit(node.args_nodes[0])
+                self.emit('[')
+                self.visit(node.args_nodes[1])
+                self.emit(':')
+                self.visit(node.args_nodes[2])
+                self.emit(']')
+
+            elif node.fun_name == 'toUpper':
+                self.visit(node.args_nodes[0])
+                self.emit('.upper()')
+
+        elif node.lib_name == 'Random':
+            if node.fun_name == 'range':
+                self.emit(self.callable('random.randrange') + '(')
+                self.int_arg(node.args_nodes[0])
+                self.emit(', ')
+                self.int_arg(node.args_nodes[1])
+                self.emit(')')
+
+        elif node.lib_name == 'Math':
+            if node.fun_name == 'sqrt':
+                self.emit(self.callable('math.sqrt') + '(')
+                self.visit(node.args_nodes[0])
+                self.emit(')')
+
+        elif node.lib_name == 'Arrays':
+            if node.fun_name == 'init':
+                self.emit('\n{}'.format(self.tabs()))
+                self.visit(node.args_nodes[0])
+                self.emit(' = []')
+
+            elif node.fun_name == 'append':
+                self.emit('\n{}'.format(self.tabs()))
+                self.visit(node.args_nodes[0])
+                self.emit('.append(')
+                self.visit(node.args_nodes[1])
+                self.emit(')')
+
+            elif node.fun_name == 'size':
+                self.emit(self.callable('len') + '(')
+                self.visit(node.args_nodes[0])
+                self.emit(')')
+
+            elif node.fun_name == 'get':
+                self.visit(node.args_nodes[0])
+                self.emit('[')
+                self.int_arg(node.args_nodes[1])
+                self.emit(']')
+
+        elif node.lib_name == 'Number':
+            if node.fun_name == 'isInteger':
+                self.emit(self.callable('float.is_integer') + '(')
+                self.visit(node.args_nodes[0])
+                self.emit(')')
+
+            elif node.fun_name == 'toString':
+                self.emit(self.callable('str') + '(')
+                self.visit(node.args_nodes[0])
+                self.emit(')')
+
+        elif node.lib_name == 'FileUtil':
+            if node.fun_name == 'read':
+                self.emit(self.callable('open') + '(')
+                self.visit(node.args_nodes[0])
+                self.emit(', \'r\').read()')
+
+        elif node.lib_name == 'This':
+            self.emit('{}('.format(node.fun_name))
+            for child in node.args_nodes:
+                self.visit(child)
+                if child != node.args_nodes[-1]:
+                    self.emit(', ')
+            self.emit(')\n')
+
+    def int_arg(self, node):
+        """
+        Writes an argument converted with int(), leaving out the conversion when the optimizer found that it
+        is an int literal or a variable always holding an int.
+        """
+        if self.optimize and isinstance(node.var, int):
+            self.emit(str(node.var))
+        elif self.optimize and self.analysis.is_int(node):
+            self.visit(node)
+        else:
+            self.emit(self.callable('int') + '(')
+            self.visit(node)
+            self.emit(')')
+
+    def visit_FunImpl(self, node):
+        s = '{}def {}('.format(self.tabs(), node.fun_name)
+        self.emit(s)
+        self.visit(node.args_node)
+
+        self.emit('):')
+        self.num_tabs += 1
+        self.visit(node.stmts_node)
+        self.visit(node.ret_node)
+        self.num_tabs -= 1
+
+    def visit_Return(self, node):
+        s = '\n{}return '.format(self.tabs())
+        self.emit(s)
+        self.visit(node.var_node)
+        self.emit('\n')
+
+    def visit_Cond(self, node):
+        self.emit('\n{}if '.format(self.tabs()))
+        self.visit(node.bool_expr)
+        self.emit(':')
+
+        self.num_tabs += 1
+        self.visit(node.stmts_node)
+        self.num_tabs -= 1
+
+    def visit_Loop(self, node):
+        self.emit('\n{}while '.format(self.tabs()))
+        self.visit(node.bool_expr)
+        self.emit(':')
+
+        self.num_tabs += 1
+        self.visit(node.stmts_node)
+        self.num_tabs -= 1
+
+    def visit_CountedLoop(self, node):
+        name = node.var_node.var[1:]
+        rounding, offset, step = COUNTED_LOOPS[node.op.type]
+        end = self.loop_end(node.bound, rounding, offset)
+        s = '\n{}for {} in {}({}, {}{}):'.format(self.tabs(), name, self.callable(LOOP_BUILTINS['range']), name, end,
+                                                 '' if step > 0 else ', -1')
+        self.emit(s)
+
+        self.num_tabs += 1
+        self.loop_depth += 1
+        if node.stmts_node.stmts:
+            self.visit(node.stmts_node)
+        else:
+            self.emit('\n{}pass'.format(self.tabs()))
+        self.loop_depth -= 1
+        self.num_tabs -= 1
+
+        # the while loop leaves the variable at the end of the range, unless it did not run at all
+        last = self.callable(LOOP_BUILTINS['max' if step > 0 else 'min'])
+        s = '\n{}{} = {}({}, {})'.format(self.tabs(), name, last, name, end)
+        self.emit(s)
+
+    def loop_end(self, bound, rounding, offset):
+        """
+        Returns the end of the range of a counted loop, the bound rounded when it can be a float and moved by
+        offset. An end other than a literal or a variable is computed once before the loop into a temporary.
+        """
+        if isinstance(bound, Num) and isinstance(bound.value, int):
+            return str(bound.value + offset)
+        int_bound = int_expression(bound, self.analysis)
+        fragments = self.emitter.fragments
+        mark = len(fragments)
+        self.bare = bound
+        self.visit(bound)
+        end = ''.join(fragments[mark:])
+        del fragments[mark:]
+        if int_bound and not offset and isinstance(bound, Var):
+            return end
+        if not int_bound:
+            end = '{}({})'.format(self.callable('math.' + rounding), end)
+        if offset:
+            end += ' {} {}'.format('+' if offset > 0 else '-', abs(offset))
+        temporary = '__nonek_end{}'.format(self.loop_depth)
+        self.emit('\n{}{} = {}'.format(self.tabs(), temporary, end))
+        return temporary
+
+    def visit_VarDecl(self, node):
+        self.visit(node.type_node)
+
+    def visit_Assign(self, node):
+        self.emit('\n')
+        self.emit(self.tabs())
+
+        self.visit(node.var_node)
+        self.emit(' = ')
+        var_type = self.analysis.type_of(node.var_node)
+        if self.optimize:
+            # the optimizer already converted literals assigned to INT variables
+            self.bare = node.expr
+            self.visit(node.expr)
+        elif var_type == 'INT' and isinstance(node.expr, Num):
+            self.emit('int(')
+            self.visit(node.expr)
+            self.emit(')')
+        else:
+            self.visit(node.expr)
+
+    def visit_Args(self, node):
+        for child in node.args:
+            self.emit(child.var_node.var)
+            if child != node.args[-1]:
+                self.emit(', ')
+
+    def visit_Stmts(self, node):
+        for child in node.stmts:
+            self.emit(self.tabs())
+            self.visit(child)
+            self.emitter.flush()
+
+    def visit_Type(self, node):
+        s = ''
+        self.emit(s)
+
+    def visit_Var(self, node):
+        if is_variable(node):
+            s = '{}'.format(node.var[1:])
+        # value is string
+        else:
+            s = '\'{}\''.format(node.var)
+        self.emit(s)
+
+    def visit_String(self, node):
+        s = '\'{}\''.format(node.value)
+        self.emit(s)
+
+    def predicate(self, node):
+        self.visit(node.args_nodes[0])
+        self.emit(self.predicates[node.fun_name])
+
+    def visit_BinOp(self, node):
+        test = predicate_test(node) if self.optimize else None
+        if test is not None:
+            # int(predicate) == 1 is the predicate itself
+            call, truth = test
+            bare = node is self.bare
+            self.emit(('' if bare else '(') + ('' if truth else 'not '))
+            self.predicate(call)
+            if not bare:
+                self.emit(')')
+            return
+
+        # a chain of operators of one level is written inside a single pair of parentheses, as Python
+        # limits how deeply they can be nested
+        spine, left = left_spine(node, same_level)
+        bare = node is self.bare
+        if not bare:
+            self.emit('(')
+        self.visit(left)
+        for binop in reversed(spine):
+            s = ' {} '.format(binop.op.value)
+            self.emit(s)
+            self.visit(binop.right)
+        if not bare:
+            self.emit(')')
+
+    def visit_UnOp(self, node):
+        if node.token.type == NOT:
+            s = 'not'
+        else:
+            s = '-'
+        self.emit(s)
+        self.visit(node.bool_expr)
+
+    def visit_Num(self, node):
+        s = '{}'.format(str(node.value))
+        self.emit(s)
+
+    def genDot(self):
+        self.tree = self.parser.parse()
+        self.analysis = analyze(self.tree)
+        return self.generate(optimize(self.tree, self.analysis, self.optimize), self.analysis)
+
+    def generate(self, tree, analysis):
+        """
+        Generates the code of a tree checked by analyze and optimized at the -O level of the visualizer.
+        """
+        self.tree = tree
+        self.analysis = analysis
+        for s in self.dot_heder:
+            self.emit(s)
+        self.visit(self.tree)
+        for s in self.dot_footer:
+            self.emit(s)
+        self.emitter.flush()
+        if self.out is None:
+            return self.emitter.sink.getvalue()
+
+
+def compile_source(text, cache=None, store_tree=False, optimize=0, backend='source'):
+    """
+    Compiles nonek source to Python, reusing the output cached for the same source, compiler, -O level and
+    backend. The ast backend builds the Python ast.Module and writes it with ast.unparse.
+    """
+    options = 'O{}'.format(optimize) if backend == 'source' else 'O{}-{}'.format(optimize, backend)
+    if cache is not None:
+        content = cache.get(text, options)
+        if content is not None:
+            return content
+
+    if backend == 'ast':
+        tree, analysis = python_ast.checked_tree(text, optimize)
+        content = python_ast.unparse(python_ast.build_module(tree, analysis, optimize))
+    else:
+        viz = ASTVisualizer(Parser(Lexer(text)), optimize=optimize)
+        content = viz.genDot()
+        tree = viz.tree
+
+    if cache is not None:
+        cache.put(text, content, tree if store_tree else None, options)
+    return content
+
+
+def profile_source(text, optimize=0, backend='source', memory=True, hooks=()):
+    """
+    Compiles nonek source like compile_source without a cache, returning the code and the Phase of every
+    step: lex, parse, analyze, optimize (with -O), then emit for the source backend or build and unparse for
+    the ast backend. The source is lexed before parsing so the two are timed apart. tracemalloc slows every
+    allocation down, so with memory the peaks are measured by a compilation before the timed one. The hooks
+    are called with each Phase once its metrics are complete, while the timed compilation goes on.
+    """
+    peaks = None
+    if memory:
+        tracer = profiling.Profiler(memory=True)
+        with tracer.tracing():
+            profiled_compile(text, optimize, backend, tracer)
+        peaks = [phase.peak_memory for phase in tracer.phases]
+    profiler = profiling.Profiler(hooks=hooks, peaks=peaks)
+    content = profiled_compile(text, optimize, backend, profiler)
+    return content, profiler.phases
+
+
+def profiled_compile(text, optimize_level, backend, profiler):
+    with profiler.phase('lex') as phase:
+        lexer = Lexer(text)
+        tokens = profiling.CountingTokenStream.prelexed(lexer)
+    phase.counts['tokens'] = len(tokens.buffer)
+    phase.counts['lines'] = lexer.line_count
+    profiler.done(phase)
+
+    with profiler.phase('parse') as phase:
+        tree = Parser(tokens).parse()
+    phase.counts.update(tokens.counts())
+    phase.counts['nodes'] = profiling.node_counts(tree)
+    profiler.done(phase)
+
+    with profiler.phase('analyze') as phase:
+        analysis = analyze(tree)
+    phase.counts['symbols'] = sum(len(scope.symbols) for scope in analysis.symbols.scopes.values())
+    phase.counts['functions'] = len(analysis.symbols.functions)
+    profiler.done(phase)
+
+    if optimize_level:
+        with profiler.phase('optimize') as phase:
+            tree = optimize(tree, analysis, optimize_level)
+        phase.counts['nodes'] = profiling.node_counts(tree)
+        profiler.done(phase)
+
+    if backend == 'ast':
+        with profiler.phase('build') as phase:
+            module = python_ast.build_module(tree, analysis, optimize_level)
+        phase.counts['statements'] = len(module.body)
+        profiler.done(phase)
+        with profiler.phase('unparse') as phase:
+            content = python_ast.unparse(module)
+    else:
+        with profiler.phase('emit') as phase:
+            content = ASTVisualizer(None, optimize=optimize_level).generate(tree, analysis)
+    phase.counts['characters'] = len(content)
+    profiler.done(phase)
+    return content
+
+
+def check_source(text):
+    """
+    Parses and checks nonek source without generating code, returning the Analysis.
+    """
+    return analyze(Parser(Lexer(text)).parse())
+
+
+def compile_to(text, out, cache=None, store_tree=False, optimize=0, backend='source'):
+    """
+    Compiles nonek source to Python written to the file-like out. Without a cache the source backend streams
+    the code as it is generated, otherwise the whole code is kept in memory and written at once.
+    """
+    if cache is None and backend == 'source':
+        ASTVisualizer(Parser(Lexer(text)), out, optimize).genDot()
+    else:
+        out.write(compile_source(text, cache, store_tree, optimize, backend))
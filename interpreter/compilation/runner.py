@@ -0,0 +1,86 @@
+import argparse
+import hashlib
+import sys
+from collections import OrderedDict
+
+from interpreter.compilation import python_ast
+from interpreter.compilation.python_source import compile_source
+from interpreter.optimization.optimizer import MAX_LEVEL
+
+# code objects of recently run programs, keyed by the hash of their nonek source
+CODE_CACHE_SIZE = 256
+code_cache = OrderedDict()
+# ast builds the Python ast.Module directly, source generates Python text that is then compiled
+BACKENDS = ('ast', 'source')
+
+
+def compile_program(source, cache=None, optimize=0, backend='source'):
+    """
+    Returns the Python code object of the nonek source, compiling it only the first time it is seen at the
+    -O level with the backend. The optional CompilationCache is used for the Python source generated by the
+    source backend.
+    """
+    key = hashlib.sha256('{}\0{}\0{}'.format(backend, optimize, source).encode('utf-8')).hexdigest()
+    code = code_cache.get(key)
+    if code is not None:
+        code_cache.move_to_end(key)
+        return code
+
+    filename = '<nonek {}>'.format(key[:12])
+    if backend == 'ast':
+        code = python_ast.compile_module(source, optimize, filename)
+    else:
+        code = compile(compile_source(source, cache, optimize=optimize), filename, 'exec')
+    code_cache[key] = code
+    if len(code_cache) > CODE_CACHE_SIZE:
+        code_cache.popitem(last=False)
+    return code
+
+
+def make_input(stdin):
+    def nonek_input(prompt=''):
+        line = stdin.readline()
+        if not line:
+            raise EOFError('EOF when reading a line')
+        return line[:-1] if line.endswith('\n') else line
+
+    return nonek_input
+
+
+def make_print(stdout):
+    def nonek_print(*args, **kwargs):
+        kwargs.setdefault('file', stdout)
+        print(*args, **kwargs)
+
+    return nonek_print
+
+
+def run(source, stdin=None, stdout=None, cache=None, optimize=0, backend='source'):
+    """
+    Compiles and executes a nonek program in a fresh namespace, reading Stdio input from stdin and writing
+    its output to stdout (the process streams by default). Returns the namespace with the program variables;
+    with -O the Execution variables are locals of __nonek_main__ and only the functions are in it.
+    """
+    namespace = {
+        '__name__': '__main__',
+        'input': make_input(stdin if stdin is not None else sys.stdin),
+        'print': make_print(stdout if stdout is not None else sys.stdout),
+    }
+    exec(compile_program(source, cache, optimize, backend), namespace)
+    return namespace
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Runs a nonek program without writing the compiled file.')
+    argparser.add_argument('fname')
+    argparser.add_argument('-O', dest='optimize', type=int, nargs='?', const=1, default=0,
+                           choices=range(MAX_LEVEL + 1), help='optimization level, -O is -O1')
+    argparser.add_argument('--backend', choices=BACKENDS, default='source', help='code generator')
+    args = argparser.parse_args()
+
+    with open(args.fname, 'r') as f:
+        run(f.read(), optimize=args.optimize, backend=args.backend)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,49 @@
-from interpreter.lexical_analysis.token import Token
+from interpreter.lexical_analysis.token import KeywordToken, Token
 from interpreter.lexical_analysis.tokenType import *
 
-
-class Lexer(object):
+# keyword tokens carry no position, so a single read only instance of each is shared by all lexers
+KEYWORDS = {
+    'Libraries': KeywordToken(LIBRARIES, 'Libraries'),
+    'Functions': KeywordToken(FUNCTIONS, 'Functions'),
+    'Execution': KeywordToken(EXECUTION, 'Execution'),
+    'INT': KeywordToken(TYPE, 'INT'),
+    'STRING': KeywordToken(TYPE, 'STRING'),
+    'FLOAT': KeywordToken(TYPE, 'FLOAT'),
+    'ARRAY': KeywordToken(TYPE, 'ARRAY'),
+    'BOOL': KeywordToken(TYPE, 'BOOL'),
+    'VOID': KeywordToken(TYPE, 'VOID'),
+    'AND': KeywordToken(AND, 'and'),
+    'OR': KeywordToken(OR, 'or'),
+    'NOT': KeywordToken(NOT, 'not'),
+    'DIV': KeywordToken(DIV, '//'),
+    'MOD': KeywordToken(MOD, '%'),
+    'COND': KeywordToken(COND, 'COND'),
+    'LOOP': KeywordToken(LOOP, 'LOOP'),
+    'RETURN': KeywordToken(RETURN, 'return'),
+}
+
+
+class TokenSource(object):
+    """
+    Base of the lexer engines, giving iteration and bulk tokenizing on top of their get_next_token, which
+    returns the next token and keeps returning the EOF token at the end of the text.
+    """
+
+    def __iter__(self):
+        """
+        Yields the remaining tokens, the last one being the EOF token.
+        """
+        token = self.get_next_token()
+        while token.type != EOF:
+            yield token
+            token = self.get_next_token()
+        yield token
+
+    def tokenize(self):
+        return list(self)
+
+
+class Lexer(TokenSource):
     def __init__(self, text):
         self.text = text
         self.line_count = 1
@@ -36,49 +77,19 @@ class Lexer(object):
         return Token(INT, int(number))
 
     def _id(self):
-        result = ''
-        while self.current_char is not None and self.current_char.isalnum():
-            result += self.current_char
-            self.advance()
-            if result == '***':
-                return Token(COMMENT, '***')
-
-        if result == 'Libraries':
-            return Token(LIBRARIES, result)
-        elif result == 'Functions':
-            return Token(FUNCTIONS, result)
-        elif result == 'Execution':
-            return Token(EXECUTION, result)
-        elif result == 'INT':
-            return Token(TYPE, result)
-        elif result == 'STRING':
-            return Token(TYPE, result)
-        elif result == 'FLOAT':
-            return Token(TYPE, result)
-        elif result == 'ARRAY':
-            return Token(TYPE, result)
-        elif result == 'BOOL':
-            return Token(TYPE, result)
-        elif result == 'VOID':
-            return Token(TYPE, result)
-        elif result == 'AND':
-            return Token(AND, 'and')
-        elif result == 'OR':
-            return Token(OR, 'or')
-        elif result == 'NOT':
-            return Token(NOT, 'not')
-        elif result == 'DIV':
-            return Token(DIV, '//')
-        elif result == 'MOD':
-            return Token(MOD, '%')
-        elif result == 'COND':
-            return Token(COND, result)
-        elif result == 'LOOP':
-            return Token(LOOP, result)
-        elif result == 'RETURN':
-            return Token(RETURN, 'return')
-        else:
-            return Token(ID, result)
+        text = self.text
+        start = end = self.pos
+        while end < len(text) and text[end].isalnum():
+            end += 1
+        result = text[start:end]
+
+        self.pos = end
+        self.current_char = text[end] if end < len(text) else None
+
+        keyword = KEYWORDS.get(result)
+        if keyword is not None:
+            return keyword
+        return Token(ID, result)
 
     def string(self):
         result = ''
@@ -211,3 +222,10 @@ class Lexer(object):
             self.error()
 
         return Token(EOF, None)
+
+
+def tokenize(text):
+    """
+    Lexes the whole text in one call and returns the list of tokens, ending with the EOF token.
+    """
+    return Lexer(text).tokenize()
@@ -0,0 +1,100 @@
+import re
+
+from interpreter.lexical_analysis.lexer import KEYWORDS, TokenSource
+from interpreter.lexical_analysis.token import Token
+from interpreter.lexical_analysis.tokenType import *
+
+# leading whitespace is consumed together with the token, the named group tells which token class matched
+TOKEN_REGEX = re.compile(r"""\s*(?:
+    (?P<NAME>[^\W\d_][^\W_]*)
+    |(?P<VARIABLE>\#(?:[^\W\d_][^\W_]*)?)
+    |(?P<OPERATOR>->|<=|>=|==|!=|[-@:,;{}.+*/()<>=])
+    |(?P<NUMBER>\d+(?:\.\d*)?)
+    |(?P<STRING>'[^']*'?)
+)""", re.VERBOSE)
+WHITESPACE_REGEX = re.compile(r'\s*')
+
+OPERATORS = {
+    '->': ARROW,
+    '<=': LESS_EQ,
+    '>=': GREATER_EQ,
+    '==': EQUAL,
+    '!=': NOT_EQUAL,
+    '-': MINUS,
+    '@': MONKEY,
+    ':': COLON,
+    ',': COMMA,
+    ';': SEMICOLON,
+    '{': LBRACKET,
+    '}': RBRACKET,
+    '.': DOT,
+    '+': PLUS,
+    '*': MUL,
+    '/': NDIV,
+    '(': LPAREN,
+    ')': RPAREN,
+    '<': LESS,
+    '>': GREATER,
+    '=': ASSIGN,
+}
+
+
+class RegexLexer(TokenSource):
+    """
+    Table-driven alternative to Lexer. Each token is recognised with a single match of TOKEN_REGEX and
+    converted through the KEYWORDS and OPERATORS tables, producing the same token stream and line numbers.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.length = len(text)
+        self.line_count = 1
+        self.pos = 0
+        # offset of the first character of the last returned token
+        self.token_start = 0
+
+    def error(self, pos):
+        current_char = self.text[pos] if pos < self.length else None
+        raise Exception('Unexpected character: {} | Line: {}'.format(current_char, self.line_count))
+
+    def get_next_token(self):
+        text = self.text
+        pos = self.pos
+        match = TOKEN_REGEX.match(text, pos)
+
+        if match is None:
+            # only whitespace is left or the next character cannot start a token
+            end = WHITESPACE_REGEX.match(text, pos).end()
+            self.line_count += text.count('\n', pos, end)
+            self.pos = self.token_start = end
+            if end >= self.length:
+                return Token(EOF, None)
+            # the hand written lexer reports the character following a lonely '!'
+            self.error(end + 1 if text[end] == '!' else end)
+
+        kind = match.lastgroup
+        start = match.start(kind)
+        if start > pos:
+            self.line_count += text.count('\n', pos, start)
+        self.token_start = start
+        self.pos = match.end()
+        value = match.group(kind)
+
+        if kind == 'NAME':
+            keyword = KEYWORDS.get(value)
+            if keyword is not None:
+                return keyword
+            return Token(ID, value)
+        elif kind == 'VARIABLE':
+            name = value[1:]
+            if name in KEYWORDS:
+                return Token(ID, '#' + KEYWORDS[name].value)
+            return Token(ID, value)
+        elif kind == 'OPERATOR':
+            return Token(OPERATORS[value], value)
+        elif kind == 'NUMBER':
+            if '.' in value:
+                return Token(FLOAT, float(value))
+            return Token(INT, int(value))
+        else:
+            return Token(STRING, value[1:-1] if value.endswith('\'') and len(value) > 1 else value[1:])
@@ -1,7 +1,29 @@
 class Token:
+    __slots__ = ('type', 'value')
+
     def __init__(self, type, value):
         self.type = type
         self.value = value
 
     def __repr__(self):
-        return "<{} {}>".format(self.type, self.value)
\ No newline at end of file
+        return "<{} {}>".format(self.type, self.value)
+
+
+class KeywordToken(Token):
+    """
+    Token of a keyword, one instance shared by every lexer, so it cannot be changed.
+    """
+    __slots__ = ()
+
+    def __init__(self, type, value):
+        object.__setattr__(self, 'type', type)
+        object.__setattr__(self, 'value', value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Keyword token {} is shared and read only.'.format(self.value))
+
+    def __delattr__(self, name):
+        raise AttributeError('Keyword token {} is shared and read only.'.format(self.value))
+
+    def __reduce__(self):
+        return KeywordToken, (self.type, self.value)
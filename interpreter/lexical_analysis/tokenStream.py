@@ -0,0 +1,92 @@
+class TokenStream(object):
+    """
+    Buffered view over the tokens produced by a lexer.
+
+    Tokens are pulled from the lexer lazily and kept only while they can still be needed: either they are
+    ahead of the current position (peeked) or a mark is active and the parser may reset back to them.
+    Lookahead therefore costs O(lookahead) instead of copying the whole parser state.
+
+    A stream can also be created over an already lexed buffer (see from_tokens and prelexed), in which case
+    the buffer is only read, so several streams, the highlighter and lint tools can share it.
+    """
+
+    def __init__(self, lexer, tokens=None, lines=None):
+        self.lexer = lexer
+        self.shared = tokens is not None
+        self.buffer = tokens if self.shared else []
+        self.lines = lines if self.shared else []
+        self.pos = 0
+        self.marks = 0
+        self.fill(1)
+        self.current_token = self.buffer[0]
+        self.line_count = self.lines[0]
+
+    @classmethod
+    def from_tokens(cls, tokens, lines):
+        """
+        Stream over a complete token list ending with EOF, lines[i] being the line of tokens[i].
+        """
+        return cls(None, tokens, lines)
+
+    @classmethod
+    def prelexed(cls, lexer):
+        """
+        Lexes the whole input in one pass and returns a stream over the resulting buffer.
+        """
+        tokens = []
+        lines = []
+        for token in lexer:
+            tokens.append(token)
+            lines.append(lexer.line_count)
+        return cls.from_tokens(tokens, lines)
+
+    def fill(self, size):
+        if self.shared:
+            return
+        while len(self.buffer) < size:
+            self.buffer.append(self.lexer.get_next_token())
+            self.lines.append(self.lexer.line_count)
+
+    def advance(self):
+        if self.shared:
+            # the last token of a complete buffer is EOF, which is returned again when reading past it
+            if self.pos < len(self.buffer) - 1:
+                self.pos += 1
+        else:
+            self.pos += 1
+            if not self.marks:
+                del self.buffer[:self.pos]
+                del self.lines[:self.pos]
+                self.pos = 0
+            self.fill(self.pos + 1)
+
+        self.current_token = self.buffer[self.pos]
+        self.line_count = self.lines[self.pos]
+        return self.current_token
+
+    def peek(self, k=1):
+        """
+        Returns the token k positions after the current one without consuming anything.
+        """
+        self.fill(self.pos + k + 1)
+        return self.buffer[min(self.pos + k, len(self.buffer) - 1)]
+
+    def seek(self, pos):
+        """
+        Moves to an absolute position of a pre-lexed buffer.
+        """
+        self.pos = pos
+        self.current_token = self.buffer[pos]
+        self.line_count = self.lines[pos]
+        return self.current_token
+
+    def mark(self):
+        self.marks += 1
+        return self.pos
+
+    def reset(self, mark):
+        self.marks -= 1
+        self.pos = mark
+        self.current_token = self.buffer[self.pos]
+        self.line_count = self.lines[self.pos]
+        return self.current_token
@@ -1,51 +1,133 @@
-INTEGER = 'INTEGER'
-INT = 'INT'
-FLOAT = 'FLOAT'
-STRING = 'STRING'
-ARRAY = 'ARRAY'
-BOOL = 'BOOL'
-VOID = 'VOID'
-
-PLUS = 'PLUS'
-MINUS = 'MINUS'
-MUL = 'MUL'
-DIV = 'DIV'
-NDIV = 'NDIV'
-MOD = 'MOD'
-
-AND = 'AND'
-OR = 'OR'
-NOT = 'NOT'
-
-LESS = 'LESS'
-GREATER = 'GREATER'
-EQUAL = 'EQUAL'
-NOT_EQUAL = 'NOT_EQUAL'
-LESS_EQ = 'LESS_EQ'
-GREATER_EQ = 'GREATER_EQ'
-
-LIBRARIES = 'LIBRARIES'
-FUNCTIONS = 'FUNCTIONS'
-EXECUTION = 'EXECUTION'
-MONKEY = 'MONKEY'
-RETURN = 'RETURN'
-
-COND = 'COND'
-LOOP = 'LOOP'
-COMMENT = 'COMMENT'
-EOF = 'EOF'
-RPAREN = 'RPAREN'
-LPAREN = 'LPAREN'
-ID = 'ID'
-TYPE = 'TYPE'
-HASH = 'HASH'
-ARROW = 'ARROW'
-
-RBRACKET = 'RBRACKET'
-LBRACKET = 'LBRACKET'
-DOT = 'DOT'
-SEMICOLON = 'SEMICOLON'
-ASSIGN = 'ASSIGN'
-COMMA = 'COMMA'
-ENTER = 'ENTER'
-COLON = 'COLON'
+from enum import IntEnum
+
+
+class TokenType(IntEnum):
+    """
+    Token kinds as small integer codes. Members format as their names, so messages and the AST
+    visualisation stay readable.
+    """
+    INTEGER = 1
+    INT = 2
+    FLOAT = 3
+    STRING = 4
+    ARRAY = 5
+    BOOL = 6
+    VOID = 7
+
+    PLUS = 8
+    MINUS = 9
+    MUL = 10
+    DIV = 11
+    NDIV = 12
+    MOD = 13
+
+    AND = 14
+    OR = 15
+    NOT = 16
+
+    LESS = 17
+    GREATER = 18
+    EQUAL = 19
+    NOT_EQUAL = 20
+    LESS_EQ = 21
+    GREATER_EQ = 22
+
+    LIBRARIES = 23
+    FUNCTIONS = 24
+    EXECUTION = 25
+    MONKEY = 26
+    RETURN = 27
+
+    COND = 28
+    LOOP = 29
+    COMMENT = 30
+    EOF = 31
+    RPAREN = 32
+    LPAREN = 33
+    ID = 34
+    TYPE = 35
+    HASH = 36
+    ARROW = 37
+
+    RBRACKET = 38
+    LBRACKET = 39
+    DOT = 40
+    SEMICOLON = 41
+    ASSIGN = 42
+    COMMA = 43
+    ENTER = 44
+    COLON = 45
+
+    def __str__(self):
+        return self.name
+
+
+INTEGER = TokenType.INTEGER
+INT = TokenType.INT
+FLOAT = TokenType.FLOAT
+STRING = TokenType.STRING
+ARRAY = TokenType.ARRAY
+BOOL = TokenType.BOOL
+VOID = TokenType.VOID
+
+PLUS = TokenType.PLUS
+MINUS = TokenType.MINUS
+MUL = TokenType.MUL
+DIV = TokenType.DIV
+NDIV = TokenType.NDIV
+MOD = TokenType.MOD
+
+AND = TokenType.AND
+OR = TokenType.OR
+NOT = TokenType.NOT
+
+LESS = TokenType.LESS
+GREATER = TokenType.GREATER
+EQUAL = TokenType.EQUAL
+NOT_EQUAL = TokenType.NOT_EQUAL
+LESS_EQ = TokenType.LESS_EQ
+GREATER_EQ = TokenType.GREATER_EQ
+
+LIBRARIES = TokenType.LIBRARIES
+FUNCTIONS = TokenType.FUNCTIONS
+EXECUTION = TokenType.EXECUTION
+MONKEY = TokenType.MONKEY
+RETURN = TokenType.RETURN
+
+COND = TokenType.COND
+LOOP = TokenType.LOOP
+COMMENT = TokenType.COMMENT
+EOF = TokenType.EOF
+RPAREN = TokenType.RPAREN
+LPAREN = TokenType.LPAREN
+ID = TokenType.ID
+TYPE = TokenType.TYPE
+HASH = TokenType.HASH
+ARROW = TokenType.ARROW
+
+RBRACKET = TokenType.RBRACKET
+LBRACKET = TokenType.LBRACKET
+DOT = TokenType.DOT
+SEMICOLON = TokenType.SEMICOLON
+ASSIGN = TokenType.ASSIGN
+COMMA = TokenType.COMMA
+ENTER = TokenType.ENTER
+COLON = TokenType.COLON
+
+# groups of token kinds tested by the parser
+SECTION_STARTS = frozenset((LIBRARIES, FUNCTIONS, EXECUTION))
+STATEMENT_STARTS = frozenset((TYPE, ID, COND, LOOP, MONKEY))
+ADDITIVE_OPS = frozenset((PLUS, MINUS))
+MULTIPLICATIVE_OPS = frozenset((MUL, NDIV, DIV, MOD))
+COMPARISON_OPS = frozenset((LESS, LESS_EQ, GREATER, GREATER_EQ, EQUAL, NOT_EQUAL))
+LOGICAL_OPS = frozenset((AND, OR))
+BOOL_OPS = COMPARISON_OPS | LOGICAL_OPS | frozenset((NOT,))
+# tokens that end the scan for a boolean operator in an assignment
+BOOL_SCAN_STOPS = frozenset((ASSIGN, MONKEY, EOF, RBRACKET, COND, LOOP))
+FUNCTION_BODY_ENDS = frozenset((RETURN, RBRACKET))
+
+# precedence levels of binary arithmetic operators, a higher level binds tighter
+ADDITIVE_LEVEL = 1
+MULTIPLICATIVE_LEVEL = 2
+PRECEDENCE = dict.fromkeys(ADDITIVE_OPS, ADDITIVE_LEVEL)
+PRECEDENCE.update(dict.fromkeys(MULTIPLICATIVE_OPS, MULTIPLICATIVE_LEVEL))
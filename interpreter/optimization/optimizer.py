@@ -0,0 +1,369 @@
+import math
+import operator
+
+from interpreter.lexical_analysis.token import Token
+from interpreter.lexical_analysis.tokenType import *
+from interpreter.semantic_analysis.analyzer import is_variable
+from interpreter.syntax_analysis.interpreter import (
+    AST, Assign, BinOp, Cond, CountedLoop, FunCall, Loop, NodeVisitor, Num, Stmts, UnOp, Var, VarDecl, iter_fields,
+    left_spine,
+)
+
+# -O levels: 1 folds constants and lowers counted loops, 2 also simplifies x + 0, x - 0, x * 1 and 1 * x relying
+# on declared types
+MAX_LEVEL = 2
+
+ARITHMETIC = {
+    PLUS: operator.add,
+    MINUS: operator.sub,
+    MUL: operator.mul,
+    NDIV: operator.truediv,
+    DIV: operator.floordiv,
+    MOD: operator.mod,
+}
+NUMERIC_TYPES = frozenset(('INT', 'FLOAT'))
+# bigger folded integers are left to the program, so a constant expression cannot blow up the output
+MAX_FOLDED_BITS = 64
+
+# comparison of a counted loop -> (rounding of the bound, offset of the end of the range, step): the loop
+# stops at the end computed from the bound in the same way for integer and float bounds
+COUNTED_LOOPS = {
+    LESS: ('ceil', 0, 1),
+    LESS_EQ: ('floor', 1, 1),
+    GREATER: ('floor', 0, -1),
+    GREATER_EQ: ('ceil', -1, -1),
+}
+# library functions changing the variable passed as their first argument
+WRITING_FUNCTIONS = frozenset((('String', 'append'), ('Arrays', 'init'), ('Arrays', 'append')))
+# library functions returning an int
+INT_FUNCTIONS = frozenset((('Stdio', 'inINT'), ('String', 'size'), ('Arrays', 'size')))
+# operators giving an int for int operands
+INT_OPS = frozenset((PLUS, MINUS, MUL, DIV, MOD))
+
+
+def make_num(value, line_number):
+    return Num(Token(INT if isinstance(value, int) else FLOAT, value), line_number)
+
+
+def foldable(value):
+    if isinstance(value, int):
+        return value.bit_length() <= MAX_FOLDED_BITS
+    # inf and nan have no literal to be written as
+    return math.isfinite(value)
+
+
+class Optimizer(NodeVisitor):
+    """
+    AST to AST pass run between the semantic analysis and code generation. Nodes are changed in place and
+    every visit returns the node replacing the visited one. Var nodes are kept, so the symbols resolved by
+    the analysis stay valid.
+
+    Level 1 only makes changes that keep the behaviour of the program: arithmetic of literals and unary
+    minus of a literal are computed, literals assigned to INT variables are converted as int() would at run
+    time, loops counting a variable proved to be an int become CountedLoop and the int() conversions of
+    such variables are left out by the code generator. Level 2 also removes adding or subtracting 0 and
+    multiplying by 1, trusting that a variable holds a value of its declared type.
+    """
+
+    def __init__(self, analysis, level=1):
+        self.analysis = analysis
+        self.level = level
+
+    def optimize(self, tree):
+        self.analysis.int_symbols = self.int_symbols(tree)
+        return self.visit(tree)
+
+    def int_symbols(self, tree):
+        """
+        Returns the INT symbols that always hold an int: the declared variables that are only assigned int
+        literals, Stdio.inINT, sizes and arithmetic of such variables. Parameters are left out, as arguments
+        are not checked at run time, and so is every level trusting declarations, as assigning #n / 2 to an
+        INT variable keeps the float.
+        """
+        analysis = self.analysis
+        candidates = set()
+        assignments = []
+        written = set()
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, VarDecl):
+                symbol = analysis.symbol(node.var_node)
+                if symbol.type == 'INT':
+                    candidates.add(symbol)
+            elif isinstance(node, Assign):
+                assignments.append((analysis.symbol(node.var_node), node.expr))
+            elif isinstance(node, FunCall) and (node.lib_name, node.fun_name) in WRITING_FUNCTIONS:
+                written.add(analysis.symbol(node.args_nodes[0]))
+            for name, value in iter_fields(node):
+                if isinstance(value, AST):
+                    stack.append(value)
+                elif isinstance(value, list):
+                    stack.extend(item for item in value if isinstance(item, AST))
+
+        ints = candidates - written
+        changed = True
+        while changed:
+            changed = False
+            for symbol, expr in assignments:
+                if symbol in ints and not self.int_valued(expr, ints):
+                    ints.discard(symbol)
+                    changed = True
+        return ints
+
+    def int_valued(self, expr, ints):
+        if isinstance(expr, Num):
+            # visit_Assign converts a literal assigned to an INT variable
+            return isinstance(expr.value, int) or foldable(expr.value)
+        return int_expression(expr, self.analysis, ints)
+
+    def transform(self, node):
+        for name, value in iter_fields(node):
+            if isinstance(value, AST):
+                setattr(node, name, self.visit(value))
+            elif isinstance(value, list):
+                value[:] = [self.visit(item) if isinstance(item, AST) else item for item in value]
+        return node
+
+    visit_Library = visit_FunImpl = visit_Return = visit_FunCall = transform
+    visit_Cond = visit_Loop = visit_VarDecl = visit_Args = transform
+
+    def visit_Program(self, node):
+        self.transform(node)
+        self.lower_loops(node.children)
+        return node
+
+    def visit_Stmts(self, node):
+        self.transform(node)
+        self.lower_loops(node.stmts)
+        return node
+
+    def lower_loops(self, statements):
+        for index, statement in enumerate(statements):
+            if isinstance(statement, Loop):
+                counted = self.counted_loop(statement, statements[:index])
+                if counted is not None:
+                    statements[index] = counted
+
+    def counted_loop(self, node, previous):
+        """
+        Returns the CountedLoop for a LOOP whose condition compares a variable with a bound and whose last
+        statement moves the variable by one towards it, when nothing else in the body writes the variable
+        or the variables of the bound and the variable is an integer when the loop starts.
+        """
+        cond = node.bool_expr
+        if not (isinstance(cond, BinOp) and cond.op.type in COUNTED_LOOPS and isinstance(cond.left, Var)
+                and is_variable(cond.left)):
+            return None
+        name = cond.left.var
+        step = COUNTED_LOOPS[cond.op.type][2]
+
+        stmts = node.stmts_node.stmts
+        if not stmts or not is_step(stmts[-1], name, step):
+            return None
+        bound_names = expression_variables(cond.right)
+        if bound_names is None or name in bound_names:
+            return None
+        written = written_variables(stmts[:-1])
+        if name in written or bound_names & written:
+            return None
+        if not self.starts_as_int(cond.left, previous):
+            return None
+
+        body = Stmts(stmts[:-1], node.stmts_node.line_number)
+        return CountedLoop(cond.left, cond.op, cond.right, body, node.line_number)
+
+    def starts_as_int(self, var_node, previous):
+        if self.analysis.is_int(var_node):
+            return True
+        # the last statement before the loop writing the variable must set it to an integer literal
+        for statement in reversed(previous):
+            if var_node.var in written_variables([statement]):
+                return (isinstance(statement, Assign) and statement.var_node.var == var_node.var
+                        and is_literal_int(statement.expr))
+        return False
+
+    def visit_Assign(self, node):
+        expr = node.expr
+        if isinstance(expr, Num) and foldable(expr.value) and self.analysis.type_of(node.var_node) == 'INT':
+            # the code generator converts a literal assigned to an INT variable with int()
+            node.expr = make_num(int(expr.value), expr.line_number)
+        else:
+            node.expr = self.visit(node.expr)
+        return node
+
+    def visit_Type(self, node):
+        return node
+
+    def visit_Var(self, node):
+        return node
+
+    def visit_String(self, node):
+        return node
+
+    def visit_Num(self, node):
+        return node
+
+    def visit_UnOp(self, node):
+        node.bool_expr = self.visit(node.bool_expr)
+        if node.token.type == MINUS and isinstance(node.bool_expr, Num):
+            return make_num(-node.bool_expr.value, node.line_number)
+        return node
+
+    def visit_BinOp(self, node):
+        spine, left = left_spine(node)
+        left = self.visit(left)
+        for binop in reversed(spine):
+            binop.left = left
+            binop.right = self.visit(binop.right)
+            left = self.fold(binop)
+        return left
+
+    def fold(self, node):
+        function = ARITHMETIC.get(node.op.type)
+        if function is None:
+            return node
+
+        left, right = node.left, node.right
+        if isinstance(left, Num) and isinstance(right, Num):
+            try:
+                value = function(left.value, right.value)
+            except (ArithmeticError, ValueError):
+                # division by zero and similar errors stay where the program would raise them
+                return node
+            return make_num(value, node.line_number) if foldable(value) else node
+
+        if self.level >= 2:
+            op = node.op.type
+            # -0.0 + 0 is 0.0, so adding 0 is dropped for integers only
+            if op == MINUS and is_literal(right, 0) and self.numeric_type(left) is not None:
+                return left
+            if op == PLUS and is_literal(right, 0) and self.numeric_type(left) == 'INT':
+                return left
+            if op == PLUS and is_literal(left, 0) and self.numeric_type(right) == 'INT':
+                return right
+            if op == MUL and is_literal(right, 1) and self.numeric_type(left) is not None:
+                return left
+            if op == MUL and is_literal(left, 1) and self.numeric_type(right) is not None:
+                return right
+        return node
+
+    def numeric_type(self, node):
+        """
+        Returns INT or FLOAT when the expression is known to give a number of that type, otherwise None.
+        """
+        if isinstance(node, Num):
+            return 'INT' if isinstance(node.value, int) else 'FLOAT'
+        elif isinstance(node, Var):
+            type = self.analysis.type_of(node)
+            return type if type in NUMERIC_TYPES else None
+        elif isinstance(node, UnOp):
+            return self.numeric_type(node.bool_expr) if node.token.type == MINUS else None
+        elif not isinstance(node, BinOp):
+            return None
+
+        spine, left = left_spine(node)
+        result = self.numeric_type(left)
+        for binop in reversed(spine):
+            right = self.numeric_type(binop.right)
+            if result is None or right is None or binop.op.type not in ARITHMETIC:
+                return None
+            result = 'FLOAT' if binop.op.type == NDIV or 'FLOAT' in (result, right) else 'INT'
+        return result
+
+
+def is_literal_int(node):
+    return isinstance(node, Num) and type(node.value) is int
+
+
+def is_literal(node, value):
+    # 0.0 is not dropped, adding it makes an integer a float
+    return is_literal_int(node) and node.value == value
+
+
+def is_step(statement, name, step):
+    # #i = #i + 1 or #i = #i - 1
+    if not (isinstance(statement, Assign) and statement.var_node.var == name and isinstance(statement.expr, BinOp)):
+        return False
+    expr = statement.expr
+    return (expr.op.type == (PLUS if step > 0 else MINUS) and isinstance(expr.left, Var) and expr.left.var == name
+            and is_literal(expr.right, 1))
+
+
+def int_expression(expr, analysis, ints=None):
+    """
+    Returns True when the expression always gives an int: int literals, Stdio.inINT, sizes, variables of the
+    ints symbols (the ones the optimizer proved by default) and the int arithmetic of those.
+    """
+    if ints is None:
+        ints = analysis.int_symbols
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Num):
+            if not isinstance(node.value, int):
+                return False
+        elif isinstance(node, Var):
+            if analysis.symbol(node) not in ints:
+                return False
+        elif isinstance(node, BinOp) and node.op.type in INT_OPS:
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, UnOp) and node.token.type == MINUS:
+            stack.append(node.bool_expr)
+        elif not (isinstance(node, FunCall) and (node.lib_name, node.fun_name) in INT_FUNCTIONS):
+            return False
+    return True
+
+
+def expression_variables(node):
+    """
+    Returns the names (with #) of the variables an arithmetic expression reads, or None when it can have
+    other effects or values, like calling a function.
+    """
+    names = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Num):
+            continue
+        elif isinstance(node, Var) and is_variable(node):
+            names.add(node.var)
+        elif isinstance(node, BinOp) and node.op.type in ARITHMETIC:
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, UnOp) and node.token.type == MINUS:
+            stack.append(node.bool_expr)
+        else:
+            return None
+    return names
+
+
+def written_variables(statements):
+    """
+    Returns the names (with #) of the variables the statements can change.
+    """
+    names = set()
+    stack = list(statements)
+    while stack:
+        statement = stack.pop()
+        if isinstance(statement, Assign):
+            names.add(statement.var_node.var)
+        elif isinstance(statement, FunCall):
+            if (statement.lib_name, statement.fun_name) in WRITING_FUNCTIONS and statement.args_nodes:
+                names.add(statement.args_nodes[0].var)
+        elif isinstance(statement, (Cond, Loop, CountedLoop)):
+            if isinstance(statement, CountedLoop):
+                # the step of a lowered loop is no statement of its body any more
+                names.add(statement.var_node.var)
+            stack.extend(statement.stmts_node.stmts)
+    return names
+
+
+def optimize(tree, analysis, level=1):
+    """
+    Returns the tree optimized at the -O level, level 0 leaves it unchanged.
+    """
+    if level <= 0:
+        return tree
+    return Optimizer(analysis, level).optimize(tree)
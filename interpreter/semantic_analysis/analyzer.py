@@ -0,0 +1,171 @@
+from interpreter.semantic_analysis.symbols import SymbolTable
+from interpreter.syntax_analysis.interpreter import NodeVisitor, left_spine
+
+
+def is_variable(node):
+    # a Var starting with '#' names a variable, otherwise it is a string literal
+    return isinstance(node.var, str) and node.var.startswith('#') and len(node.var) > 1
+
+
+class Analysis(object):
+    """
+    Result of the semantic analysis of a tree: its symbol table and the symbols resolved for nodes. The
+    nodes have slots only, so the annotations are kept here, keyed by the nodes.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        # Var and declared variable nodes -> Symbol
+        self.variables = {}
+        # FunImpl and calls of This -> FunctionSymbol
+        self.functions = {}
+        # INT symbols always holding an int, found by the optimizer; empty without optimization
+        self.int_symbols = set()
+
+    def symbol(self, node):
+        return self.variables.get(node)
+
+    def type_of(self, node):
+        symbol = self.variables.get(node)
+        return None if symbol is None else symbol.type
+
+    def is_int(self, node):
+        return self.variables.get(node) in self.int_symbols
+
+
+class SemanticAnalyzer(NodeVisitor):
+    """
+    Checks that used libraries, functions and variables are declared and that argument and return types
+    match, visiting nodes in the order the code generators do, so the first error is the same one.
+    """
+
+    def __init__(self):
+        self.libs = set()
+        self.symbols = SymbolTable()
+        self.scope = self.symbols.main
+        # function whose implementation is being checked
+        self.function = None
+        self.analysis = Analysis(self.symbols)
+
+    def analyze(self, tree):
+        self.visit(tree)
+        return self.analysis
+
+    def visit_Program(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_Library(self, node):
+        self.libs.add(node.library)
+
+    def visit_FunImpl(self, node):
+        if self.symbols.function(node.fun_name) is not None:
+            raise Exception('Function {} already defined.\nLine: {}'.format(node.fun_name, node.line_number))
+        self.scope = self.symbols.scope(node.fun_name)
+        self.function = self.symbols.define_function(node.fun_name, self.scope)
+        self.analysis.functions[node] = self.function
+
+        self.visit(node.args_node)
+        self.visit(node.stmts_node)
+        self.visit(node.ret_node)
+
+        expected_type = self.function.ret_type
+        found_type = self.scope.type_of(node.ret_node.var_node.var[1:])
+        if expected_type != found_type:
+            raise Exception('In function {} expected return type {}, but {} found.\nLine: {}'
+                            .format(node.fun_name, expected_type, found_type, node.ret_node.line_number))
+
+        self.scope = self.symbols.main
+        self.function = None
+
+    def visit_Args(self, node):
+        for child in node.args:
+            # parameters are variables of the function scope and part of its signature
+            symbol = self.scope.define(child.var_node.var, child.type_node.type, child.line_number)
+            self.analysis.variables[child.var_node] = symbol
+            self.function.arg_types.append(child.type_node.type)
+            self.function.arg_names.append(child.var_node.var)
+
+    def visit_Return(self, node):
+        self.visit(node.var_node)
+        self.function.ret_type = node.type_node.type
+
+    def visit_Stmts(self, node):
+        for child in node.stmts:
+            self.visit(child)
+
+    def visit_Cond(self, node):
+        self.visit(node.bool_expr)
+        self.visit(node.stmts_node)
+
+    def visit_Loop(self, node):
+        self.visit(node.bool_expr)
+        self.visit(node.stmts_node)
+
+    def visit_VarDecl(self, node):
+        if node.var_node.var in self.scope:
+            raise Exception('Variable {} already defined in {}.\nLine: {}'
+                            .format(node.var_node.var, self.scope.name, node.var_node.line_number))
+        symbol = self.scope.define(node.var_node.var, node.type_node.type, node.var_node.line_number)
+        self.analysis.variables[node.var_node] = symbol
+
+    def visit_Assign(self, node):
+        self.visit(node.var_node)
+        self.visit(node.expr)
+
+    def visit_FunCall(self, node):
+        if node.lib_name != 'This':
+            if node.lib_name not in self.libs:
+                raise Exception('Library {} is not imported.\nLine: {}'.format(node.lib_name, node.line_number))
+            for child in node.args_nodes:
+                self.visit(child)
+            return
+
+        function = self.symbols.function(node.fun_name)
+        if function is None:
+            raise Exception('Function {} is not defined.\nLine: {}'.format(node.fun_name, node.line_number))
+
+        if len(node.args_nodes) != function.arg_count:
+            raise Exception('Function {} expects {} arguments, but {} given.\nLine: {}'
+                            .format(node.fun_name, function.arg_count, len(node.args_nodes), node.line_number))
+
+        for expected_type, child in zip(function.arg_types, node.args_nodes):
+            found_type = self.scope.type_of(child.var[1:])
+            if expected_type != found_type:
+                raise Exception('In function {} argument type {} expected, but {} given.\nLine: {}'
+                                .format(node.fun_name, expected_type, found_type, node.line_number))
+            self.visit(child)
+        self.analysis.functions[node] = function
+
+    def visit_Var(self, node):
+        if is_variable(node):
+            symbol = self.scope.lookup(node.var[1:])
+            if symbol is None:
+                raise Exception('Variable {} is not defined in {}.\nLine: {}'
+                                .format(node.var[1:], self.scope.name, node.line_number))
+            self.analysis.variables[node] = symbol
+
+    def visit_BinOp(self, node):
+        spine, left = left_spine(node)
+        self.visit(left)
+        for binop in reversed(spine):
+            self.visit(binop.right)
+
+    def visit_UnOp(self, node):
+        self.visit(node.bool_expr)
+
+    def visit_Type(self, node):
+        pass
+
+    def visit_String(self, node):
+        pass
+
+    def visit_Num(self, node):
+        pass
+
+
+def analyze(tree):
+    """
+    Checks the tree and returns its Analysis, raising the first semantic error found.
+    """
+    return SemanticAnalyzer().analyze(tree)
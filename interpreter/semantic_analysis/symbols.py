@@ -0,0 +1,91 @@
+import sys
+
+
+class Symbol(object):
+    """
+    Variable or parameter of a scope with its declared type.
+    """
+    __slots__ = ('name', 'type', 'line_number')
+
+    def __init__(self, name, type, line_number):
+        self.name = name
+        self.type = type
+        self.line_number = line_number
+
+
+class FunctionSymbol(object):
+    """
+    Function of the Functions section: its parameters, return type and the scope of its body.
+    """
+    __slots__ = ('name', 'arg_names', 'arg_types', 'ret_type', 'scope')
+
+    def __init__(self, name, scope):
+        self.name = name
+        self.arg_names = []
+        self.arg_types = []
+        self.ret_type = ''
+        self.scope = scope
+
+    @property
+    def arg_count(self):
+        return len(self.arg_names)
+
+
+class Scope(object):
+    """
+    Names declared in Execution or in one function, kept in a dict for constant time lookups. A scope
+    without a name found looks in its parent; function scopes have none, as nonek functions do not see
+    the variables of Execution.
+    """
+    __slots__ = ('name', 'parent', 'symbols')
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.symbols = {}
+
+    def define(self, name, type, line_number=-1):
+        name = sys.intern(name)
+        symbol = self.symbols[name] = Symbol(name, type, line_number)
+        return symbol
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+    def lookup(self, name):
+        scope = self
+        while scope is not None:
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
+        return None
+
+    def type_of(self, name):
+        symbol = self.lookup(name)
+        return None if symbol is None else symbol.type
+
+
+class SymbolTable(object):
+    """
+    Scopes of a program: main for Execution and one per function, with the functions by name.
+    """
+
+    def __init__(self):
+        self.main = Scope('main')
+        self.scopes = {'main': self.main}
+        self.functions = {}
+
+    def scope(self, name):
+        """
+        Returns a new empty scope for name, replacing an earlier one.
+        """
+        scope = self.scopes[name] = Scope(sys.intern(name))
+        return scope
+
+    def define_function(self, name, scope):
+        function = self.functions[sys.intern(name)] = FunctionSymbol(name, scope)
+        return function
+
+    def function(self, name):
+        return self.functions.get(name)
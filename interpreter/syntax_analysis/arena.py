@@ -0,0 +1,185 @@
+from array import array
+
+from interpreter.lexical_analysis.token import Token
+from interpreter.syntax_analysis.interpreter import (
+    Args, Assign, BinOp, Cond, CountedLoop, FunCall, FunImpl, Library, Loop, Num, Program, Return, Stmts, String,
+    Type, UnOp, Var, VarDecl,
+)
+
+NODE_CLASSES = (Program, Library, FunImpl, Return, FunCall, Cond, Loop, Type, Var, String, VarDecl, Assign, Args,
+                Stmts, BinOp, UnOp, Num, CountedLoop)
+KINDS = {cls: kind for kind, cls in enumerate(NODE_CLASSES)}
+
+# a field reference keeps its tag in the low two bits and an index in the rest
+TAG_BITS = 2
+TAG_MASK = (1 << TAG_BITS) - 1
+NODE, VALUE, LIST, NONE = range(4)
+
+
+def value_key(value):
+    # 1, 1.0 and True are equal as dict keys, the type keeps them apart
+    if isinstance(value, Token):
+        return Token, value.type, value.value
+    return type(value), value
+
+
+class NodeView(object):
+    """
+    Read only node of an arena, looking like the AST node of the same class name to visitors.
+    """
+    __slots__ = ('arena', 'index')
+    node_class = None
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def line_number(self):
+        return self.arena.lines[self.index]
+
+    def __repr__(self):
+        return '<{} view {}>'.format(type(self).__name__, self.index)
+
+
+def field_property(position):
+    def get(self):
+        arena = self.arena
+        return arena.load(arena.refs[arena.starts[self.index] + position])
+
+    return property(get)
+
+
+def make_view_class(cls):
+    namespace = {'__slots__': (), 'node_class': cls}
+    for position, name in enumerate(cls.__slots__):
+        namespace[name] = field_property(position)
+    return type(cls.__name__, (NodeView,), namespace)
+
+
+VIEW_CLASSES = tuple(make_view_class(cls) for cls in NODE_CLASSES)
+
+
+class Arena(object):
+    """
+    Syntax tree stored in flat typed arrays instead of one object per node.
+
+    Node i has the class NODE_CLASSES[kinds[i]], the line lines[i] and its fields are the references
+    refs[starts[i]:starts[i] + number of fields]. A list field is stored in refs as its length followed by
+    the references of its items. Names, strings, numbers and tokens are kept once in values. The root is
+    node 0, view(i) gives a view of node i usable by visitors and to_tree rebuilds the AST objects.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.lines = array('i')
+        self.starts = array('i')
+        self.refs = array('i')
+        self.values = []
+
+    @classmethod
+    def from_tree(cls, tree):
+        arena = cls()
+        arena.value_indexes = {}
+        # (position in refs, value) still to be stored, popped in the order of a pre-order walk
+        pending = [(None, tree)]
+        while pending:
+            position, value = pending.pop()
+            ref = arena.store(value, pending)
+            if position is not None:
+                arena.refs[position] = ref
+        del arena.value_indexes
+        return arena
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def store(self, value, pending):
+        """
+        Adds the value to the arena and returns its reference. Slots are reserved for the fields of a node and
+        the items of a list, their values are added to pending.
+        """
+        if value is None:
+            return NONE
+        elif isinstance(value, list):
+            refs = self.refs
+            start = len(refs)
+            refs.append(len(value))
+            refs.extend([0] * len(value))
+            for i in range(len(value) - 1, -1, -1):
+                pending.append((start + 1 + i, value[i]))
+            return start << TAG_BITS | LIST
+
+        kind = KINDS.get(type(value))
+        if kind is None:
+            key = value_key(value)
+            index = self.value_indexes.get(key)
+            if index is None:
+                index = self.value_indexes[key] = len(self.values)
+                self.values.append(value)
+            return index << TAG_BITS | VALUE
+
+        # the fields are reserved before the children are stored, so they stay next to each other
+        index = len(self.kinds)
+        self.kinds.append(kind)
+        self.lines.append(value.line_number)
+        start = len(self.refs)
+        self.starts.append(start)
+        fields = type(value).__slots__
+        self.refs.extend([0] * len(fields))
+        for position in range(len(fields) - 1, -1, -1):
+            pending.append((start + position, getattr(value, fields[position])))
+        return index << TAG_BITS | NODE
+
+    def load(self, ref):
+        tag = ref & TAG_MASK
+        index = ref >> TAG_BITS
+        if tag == NODE:
+            return self.view(index)
+        elif tag == VALUE:
+            return self.values[index]
+        elif tag == LIST:
+            refs = self.refs
+            return [self.load(refs[i]) for i in range(index + 1, index + 1 + refs[index])]
+        return None
+
+    def view(self, index=0):
+        return VIEW_CLASSES[self.kinds[index]](self, index)
+
+    @property
+    def root(self):
+        return self.view(0)
+
+    def to_tree(self):
+        """
+        Rebuilds the AST objects. Nodes are numbered in pre-order, so building them from the last one
+        always finds the children already built.
+        """
+        nodes = [None] * len(self)
+        for index in range(len(self) - 1, -1, -1):
+            cls = NODE_CLASSES[self.kinds[index]]
+            node = cls.__new__(cls)
+            node.line_number = self.lines[index]
+            start = self.starts[index]
+            for position, name in enumerate(cls.__slots__):
+                setattr(node, name, self.build(self.refs[start + position], nodes))
+            nodes[index] = node
+        return nodes[0]
+
+    def build(self, ref, nodes):
+        tag = ref & TAG_MASK
+        index = ref >> TAG_BITS
+        if tag == NODE:
+            return nodes[index]
+        elif tag == VALUE:
+            return self.values[index]
+        elif tag == LIST:
+            refs = self.refs
+            return [self.build(refs[i], nodes) for i in range(index + 1, index + 1 + refs[index])]
+        return None
+
+    def __getstate__(self):
+        return self.kinds, self.lines, self.starts, self.refs, self.values
+
+    def __setstate__(self, state):
+        self.kinds, self.lines, self.starts, self.refs, self.values = state
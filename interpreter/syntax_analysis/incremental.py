@@ -0,0 +1,303 @@
+from bisect import bisect_left
+
+from interpreter.lexical_analysis.regexLexer import RegexLexer
+from interpreter.lexical_analysis.tokenStream import TokenStream
+from interpreter.lexical_analysis.tokenType import EOF, RBRACKET, RETURN
+from interpreter.syntax_analysis.interpreter import AST, Cond, FunImpl, Loop, iter_fields
+from interpreter.syntax_analysis.parser import Parser
+
+# tokens closing a sequence of units, a re-parse reaching one of them changed the enclosing structure
+UNIT_ENDS = frozenset((RBRACKET, RETURN, EOF))
+
+
+class Unit(object):
+    """
+    Part of the program that can be parsed on its own: the body of the Libraries section, one function
+    implementation or one statement_list. It produced nodes from tokens [start, end). Statement lists of the
+    body of a function, condition or loop are its children, and body.stmts is the concatenation of their nodes.
+    """
+
+    def __init__(self, kind, start, end, nodes, children):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.nodes = nodes
+        self.children = children
+        self.parent = None
+        self.body = None
+
+        if nodes and isinstance(nodes[0], (FunImpl, Cond, Loop)):
+            self.body = nodes[0].stmts_node
+        for child in children:
+            child.parent = self
+
+    def shift(self, delta):
+        self.start += delta
+        self.end += delta
+        for child in self.children:
+            child.shift(delta)
+
+
+class SpanParser(Parser):
+    """
+    Parser that remembers which tokens every unit of the program was parsed from.
+    """
+
+    def __init__(self, lexer):
+        super().__init__(lexer)
+        self.frames = [[]]
+
+    def parse_unit(self, kind, parse):
+        start = self.tokens.pos
+        self.frames.append([])
+        result = parse()
+        nodes = result if isinstance(result, list) else [result]
+        unit = Unit(kind, start, self.tokens.pos, nodes, self.frames.pop())
+        self.frames[-1].append(unit)
+        return result
+
+    def libraries(self):
+        return self.parse_unit('libraries', super().libraries)
+
+    def function_implementation(self):
+        return self.parse_unit('function', super().function_implementation)
+
+    def statement_list(self):
+        return self.parse_unit('statements', super().statement_list)
+
+
+def shift_lines(nodes, delta):
+    # walked with a stack, long expression chains are deeper than the recursion limit. Chained assignments
+    # share their Var node, so every node is shifted only the first time it is reached
+    stack = list(nodes)
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, AST) and id(node) not in seen:
+            seen.add(id(node))
+            node.line_number += delta
+            for name, value in iter_fields(node):
+                if isinstance(value, (AST, list)):
+                    stack.append(value)
+
+
+class Document(object):
+    """
+    Source text kept together with its tokens and syntax tree, updated incrementally on every edit.
+
+    An edit re-lexes tokens from the first one it touches until the new token stream meets the old one again,
+    then re-parses only the innermost unit containing the changed tokens, so unchanged subtrees are reused.
+    When the edit changes the number of lines, the whole top level unit is re-parsed, because nodes of
+    enclosing statements take their line from tokens that can come after the edit. Units after the edit keep
+    their nodes, only moved by the line difference. A syntax error is kept in error, with tree set to None,
+    and the next edit parses the whole text again.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tree = None
+        self.error = None
+        self.units = []
+        # index of the token at which parsing of the program stopped
+        self.end = 0
+        # units re-parsed by the last edit, None when the whole text was parsed
+        self.reparsed = None
+        self.tokens = self.lines = self.starts = self.ends = None
+        self.lex_and_parse()
+
+    def lex(self, pos, line_count, sync):
+        """
+        Lexes from pos until EOF or, when sync(token, start, end) returns True, until the first such token.
+        """
+        lexer = RegexLexer(self.text)
+        lexer.pos = pos
+        lexer.line_count = line_count
+
+        tokens, lines, starts, ends = [], [], [], []
+        while True:
+            token = lexer.get_next_token()
+            tokens.append(token)
+            lines.append(lexer.line_count)
+            starts.append(lexer.token_start)
+            ends.append(lexer.pos)
+            if token.type == EOF or (sync is not None and sync(token, lexer.token_start, lexer.pos)):
+                return tokens, lines, starts, ends
+
+    def fail(self, error):
+        self.tree = None
+        self.error = str(error)
+        self.units = []
+
+    def lex_and_parse(self):
+        try:
+            self.tokens, self.lines, self.starts, self.ends = self.lex(0, 1, None)
+        except Exception as e:
+            # without tokens the next edit lexes the whole text again
+            self.tokens = self.lines = self.starts = self.ends = None
+            self.reparsed = None
+            self.fail(e)
+            return
+        self.parse()
+
+    def parse(self):
+        self.reparsed = None
+        parser = SpanParser(TokenStream.from_tokens(self.tokens, self.lines))
+        try:
+            self.tree = parser.parse()
+        except Exception as e:
+            self.fail(e)
+            return
+
+        self.error = None
+        self.units = parser.frames[0]
+        self.end = parser.tokens.pos
+
+    def edit(self, offset, deleted, inserted):
+        """
+        Replaces deleted characters at offset with the inserted text and updates tokens and tree.
+        """
+        self.text = self.text[:offset] + inserted + self.text[offset + deleted:]
+        if self.tokens is None:
+            self.lex_and_parse()
+            return self.tree
+        delta = len(inserted) - deleted
+
+        # the first token touching the edit could merge with the inserted text, lexing restarts before it
+        first = bisect_left(self.ends, offset)
+        pos = self.ends[first - 1] if first else 0
+        line_count = self.lines[first - 1] if first else 1
+
+        old = {'index': first, 'synced': False}
+        edit_end = offset + len(inserted)
+
+        def sync(token, start, end):
+            if start < edit_end:
+                return False
+            while self.starts[old['index']] + delta < start:
+                old['index'] += 1
+            index = old['index']
+            other = self.tokens[index]
+            old['synced'] = (self.starts[index] + delta == start and self.ends[index] + delta == end
+                             and other.type == token.type and other.value == token.value)
+            return old['synced']
+
+        try:
+            tokens, lines, starts, ends = self.lex(pos, line_count, sync)
+        except Exception as e:
+            self.tokens = self.lines = self.starts = self.ends = None
+            self.reparsed = None
+            self.fail(e)
+            return self.tree
+        last = old['index'] if old['synced'] else len(self.tokens) - 1
+        line_delta = lines[-1] - self.lines[last]
+
+        # tokens [first, last) were replaced by all new tokens except the last one, which matches token last
+        self.tokens[first:last + 1] = tokens
+        self.lines[first:last + 1] = lines
+        self.starts[first:last + 1] = starts
+        self.ends[first:last + 1] = ends
+        following = first + len(tokens)
+        for i in range(following, len(self.tokens)):
+            self.starts[i] += delta
+            self.ends[i] += delta
+            self.lines[i] += line_delta
+
+        if self.tree is None or not old['synced']:
+            self.parse()
+        else:
+            self.reparse(first, last, len(tokens) - 1 - (last - first), line_delta)
+        return self.tree
+
+    def find_unit(self, units, first, last, top_level):
+        for unit in units:
+            if unit.start < first and last <= unit.end:
+                if top_level or not unit.children:
+                    return unit
+                return self.find_unit(unit.children, first, last, False) or unit
+            if unit.start >= last:
+                break
+        return None
+
+    def reparse(self, first, last, token_delta, line_delta):
+        """
+        Re-parses the innermost unit containing old tokens [first, last), going to enclosing units when the
+        new tokens do not end the unit at the same place. Inserted tokens that form new statements after the
+        unit are parsed as further units in its place.
+        """
+        unit = self.find_unit(self.units, first, last, line_delta != 0)
+        if first == last and token_delta == 0 and line_delta == 0:
+            # only whitespace between tokens changed
+            self.reparsed = []
+            return
+
+        while unit is not None:
+            parser = SpanParser(TokenStream.from_tokens(self.tokens, self.lines))
+            parser.current_token = parser.tokens.seek(unit.start)
+            end = unit.end + token_delta
+            try:
+                while parser.tokens.pos < end and parser.current_token.type not in UNIT_ENDS:
+                    if unit.kind == 'libraries':
+                        parser.libraries()
+                        break
+                    elif unit.kind == 'function':
+                        parser.function_implementation()
+                    else:
+                        parser.statement_list()
+            except Exception as e:
+                self.fail(e)
+                return
+
+            if parser.tokens.pos == end and not self.empties_block(unit, parser.frames[0]):
+                self.replace(unit, parser.frames[0], token_delta, line_delta)
+                return
+            unit = unit.parent
+
+        self.parse()
+
+    def empties_block(self, unit, new_units):
+        """
+        Returns True when the new units leave the body of the enclosing COND or LOOP without statements, which
+        the parser of that statement rejects, so the enclosing unit is re-parsed to raise its error.
+        """
+        parent = unit.parent
+        if parent is None or not isinstance(parent.nodes[0], (Cond, Loop)):
+            return False
+        siblings = [sibling for sibling in parent.children if sibling is not unit] + new_units
+        return not any(sibling.nodes for sibling in siblings)
+
+    def replace(self, unit, new_units, token_delta, line_delta):
+        siblings = self.units if unit.parent is None else unit.parent.children
+        index = siblings.index(unit)
+        siblings[index:index + 1] = new_units
+        for new_unit in new_units:
+            new_unit.parent = unit.parent
+
+        nodes = []
+        for sibling in siblings:
+            nodes.extend(sibling.nodes)
+        if unit.parent is None:
+            self.tree.children[:] = nodes
+        else:
+            unit.parent.body.stmts[:] = nodes
+
+        # units after the new ones are moved by the token difference, enclosing units grow by it
+        following = siblings[index + len(new_units):]
+        current = unit.parent
+        while True:
+            for sibling in following:
+                sibling.shift(token_delta)
+                if line_delta:
+                    shift_lines(sibling.nodes, line_delta)
+            if current is None:
+                break
+            current.end += token_delta
+            siblings = self.units if current.parent is None else current.parent.children
+            following = siblings[siblings.index(current) + 1:]
+            current = current.parent
+
+        self.end += token_delta
+        self.tree.line_number = self.lines[self.end]
+        self.error = None
+        self.reparsed = new_units
@@ -1,21 +1,29 @@
 class AST(object):
+    __slots__ = ('line_number',)
+
     def __init__(self, line_number):
         self.line_number = line_number
 
 
 class Program(AST):
+    __slots__ = ('children',)
+
     def __init__(self, sections, line_number):
         super().__init__(line_number)
         self.children = sections
 
 
 class Library(AST):
+    __slots__ = ('library',)
+
     def __init__(self, library, line_number):
         super().__init__(line_number)
         self.library = library
 
 
 class FunImpl(AST):
+    __slots__ = ('fun_name', 'args_node', 'stmts_node', 'ret_node')
+
     def __init__(self, fun_name, args_node, stmts_node, ret_node, line_number):
         super().__init__(line_number)
         self.fun_name = fun_name
@@ -25,6 +33,8 @@ class FunImpl(AST):
 
 
 class Return(AST):
+    __slots__ = ('type_node', 'var_node')
+
     def __init__(self, type_node, var_node, line_number):
         super().__init__(line_number)
         self.type_node = type_node
@@ -32,6 +42,8 @@ class Return(AST):
 
 
 class FunCall(AST):
+    __slots__ = ('lib_name', 'fun_name', 'args_nodes')
+
     def __init__(self, lib_name, fun_name, args_nodes, line_number):
         super().__init__(line_number)
         self.lib_name = lib_name
@@ -40,6 +52,8 @@ class FunCall(AST):
 
 
 class Cond(AST):
+    __slots__ = ('bool_expr', 'stmts_node')
+
     def __init__(self, bool_expr, stmts_node, line_number):
         super().__init__(line_number)
         self.bool_expr = bool_expr
@@ -47,25 +61,45 @@ class Cond(AST):
 
 
 class Loop(AST):
+    __slots__ = ('bool_expr', 'stmts_node')
+
     def __init__(self, bool_expr, stmts_node, line_number):
         super().__init__(line_number)
         self.bool_expr = bool_expr
         self.stmts_node = stmts_node
 
 
+# made by the optimizer from a LOOP counting var_node by one towards bound, op is the comparison of its
+# condition and stmts_node the body without the increment
+class CountedLoop(AST):
+    __slots__ = ('var_node', 'op', 'bound', 'stmts_node')
+
+    def __init__(self, var_node, op, bound, stmts_node, line_number):
+        super().__init__(line_number)
+        self.var_node = var_node
+        self.op = op
+        self.bound = bound
+        self.stmts_node = stmts_node
+
+
 class Type(AST):
+    __slots__ = ('type',)
+
     def __init__(self, type, line_number):
         super().__init__(line_number)
         self.type = type
 
 
 class Var(AST):
+    __slots__ = ('var',)
+
     def __init__(self, var, line_number):
         super().__init__(line_number)
         self.var = var
 
 
 class String(AST):
+    __slots__ = ('value',)
 
     def __init__(self, value, line_number):
         super().__init__(line_number)
@@ -73,6 +107,8 @@ class String(AST):
 
 
 class VarDecl(AST):
+    __slots__ = ('type_node', 'var_node')
+
     def __init__(self, type_node, var_node, line_number):
         super().__init__(line_number)
         self.type_node = type_node
@@ -80,6 +116,8 @@ class VarDecl(AST):
 
 
 class Assign(AST):
+    __slots__ = ('var_node', 'expr')
+
     def __init__(self, var_node, expr, line_number):
         super().__init__(line_number)
         self.var_node = var_node
@@ -87,26 +125,38 @@ class Assign(AST):
 
 
 class Args(AST):
+    __slots__ = ('args',)
+
     def __init__(self, args, line_number):
         super().__init__(line_number)
         self.args = args
 
 
 class Stmts(AST):
+    __slots__ = ('stmts',)
+
     def __init__(self, stmts, line_number):
         super().__init__(line_number)
         self.stmts = stmts
 
 
 class BinOp(AST):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right, line_number):
         super().__init__(line_number)
         self.left = left
-        self.token = self.op = op
+        self.op = op
         self.right = right
 
+    @property
+    def token(self):
+        return self.op
+
 
 class UnOp(AST):
+    __slots__ = ('token', 'bool_expr')
+
     def __init__(self, token, bool_expr, line_number):
         super().__init__(line_number)
         self.token = token
@@ -114,17 +164,56 @@ class UnOp(AST):
 
 
 class Num(AST):
+    __slots__ = ('value',)
+
     def __init__(self, token, line_number):
         super().__init__(line_number)
-        self.token = token
         self.value = token.value
 
 
+def iter_fields(node):
+    """
+    Yields (name, value) of the fields of the node, without its line number.
+    """
+    for name in node.__slots__:
+        yield name, getattr(node, name)
+
+
+def left_spine(node, follows=None):
+    """
+    Returns the BinOp nodes reached from node through left operands, node first, and the operand below
+    the last of them. follows(parent, left) can end the chain earlier. Long left associative chains are
+    visited in a loop over the spine instead of one nested call per operator.
+    """
+    spine = [node]
+    left = node.left
+    while isinstance(left, BinOp) and (follows is None or follows(spine[-1], left)):
+        spine.append(left)
+        left = left.left
+    return spine, left
+
+
 class NodeVisitor(object):
+    """
+    Calls visit_<node class name> of the visitor for a node. The method for each node class is looked up
+    once per visitor class and kept in its dispatch table.
+    """
+    dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch = {}
+
     def visit(self, node):
-        method_name = 'visit_{}'.format(type(node).__name__)
-        visitor = getattr(self, method_name, self.error)
-        return visitor(node)
+        try:
+            visitor = self.dispatch[node.__class__]
+        except KeyError:
+            visitor = getattr(type(self), 'visit_{}'.format(type(node).__name__), None)
+            self.dispatch[node.__class__] = visitor
+
+        if visitor is None:
+            return self.error(node)
+        return visitor(self, node)
 
     def error(self, node):
         raise Exception('Not found {}'.format(type(node).__name__))
@@ -1,20 +1,50 @@
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.lexical_analysis.regexLexer import RegexLexer
+from interpreter.lexical_analysis.tokenStream import TokenStream
 from interpreter.lexical_analysis.tokenType import *
 from interpreter.syntax_analysis.interpreter import *
 from interpreter.syntax_analysis.util import restorable
 
+# lexer engines that can be selected by name when parsing source text
+LEXERS = {
+    'handwritten': Lexer,
+    'regex': RegexLexer,
+}
+
 
 class Parser(object):
     def __init__(self, lexer):
-        self.lexer = lexer
-        self.current_token = self.lexer.get_next_token()
+        """
+        Parses tokens of the lexer, which can also be a TokenStream over a pre-lexed buffer.
+        """
+        if isinstance(lexer, TokenStream):
+            self.lexer = lexer.lexer
+            self.tokens = lexer
+        else:
+            self.lexer = lexer
+            self.tokens = TokenStream(lexer)
+        self.current_token = self.tokens.current_token
+
+    @classmethod
+    def from_text(cls, text, lexer='handwritten'):
+        """
+        Creates a parser over the text using one of the lexer engines registered in LEXERS.
+        """
+        if lexer not in LEXERS:
+            raise Exception('Unknown lexer {}, expected one of: {}'.format(lexer, ', '.join(sorted(LEXERS))))
+        return cls(LEXERS[lexer](text))
+
+    @property
+    def line_count(self):
+        return self.tokens.line_count
 
     def error(self, expected, found):
         raise Exception('Error parsing: expected {}, but found {}.\nLine: {}'
-                        .format(expected, found, self.lexer.line_count))
+                        .format(expected, found, self.line_count))
 
     def eat(self, type):
         if self.current_token.type == type:
-            self.current_token = self.lexer.get_next_token()
+            self.current_token = self.tokens.advance()
         else:
             self.error(type, self.current_token.type)
 
@@ -26,7 +56,7 @@ class Parser(object):
         """
         sections = []
 
-        while self.current_token.type in [LIBRARIES, FUNCTIONS, EXECUTION]:
+        while self.current_token.type in SECTION_STARTS:
             if self.current_token.type == LIBRARIES:
                 self.eat(LIBRARIES)
                 sections.extend(self.libraries())
@@ -37,7 +67,7 @@ class Parser(object):
                 self.eat(EXECUTION)
                 sections.extend(self.execution())
 
-        return Program(sections, self.lexer.line_count)
+        return Program(sections, self.line_count)
 
     @restorable
     def check_function(self):
@@ -64,7 +94,7 @@ class Parser(object):
         library = self.current_token
         self.eat(ID)
 
-        return Library(library.value, self.lexer.line_count)
+        return Library(library.value, self.line_count)
 
     def functions(self):
         """
@@ -73,7 +103,7 @@ class Parser(object):
         self.eat(LBRACKET)
         functions = []
 
-        while self.current_token.type is not RBRACKET:
+        while self.current_token.type != RBRACKET:
             functions.append(self.function_implementation())
         self.eat(RBRACKET)
         return functions
@@ -85,7 +115,7 @@ class Parser(object):
         self.eat(LBRACKET)
         statements = []
 
-        while self.current_token.type is not RBRACKET:
+        while self.current_token.type != RBRACKET:
             statements.extend(self.statement_list())
         self.eat(RBRACKET)
         return statements
@@ -102,29 +132,29 @@ class Parser(object):
         self.eat(ID)
         self.eat(COLON)
         self.eat(LPAREN)
-        args_list = Args(self.argument_list(), self.lexer.line_count)
+        args_list = Args(self.argument_list(), self.line_count)
         self.eat(RPAREN)
         self.eat(ARROW)
 
-        ret_type = Type(self.current_token.value, self.lexer.line_count)
+        ret_type = Type(self.current_token.value, self.line_count)
         self.eat(TYPE)
 
         self.eat(LBRACKET)
         stmts_list = []
-        while self.current_token.type not in [RETURN, RBRACKET]:
+        while self.current_token.type not in FUNCTION_BODY_ENDS:
             stmts_list.extend(self.statement_list())
 
-        ret_val = Var('', self.lexer.line_count)
+        ret_val = Var('', self.line_count)
         ret_line = -1
         if self.current_token.type == RETURN:
-            ret_line = self.lexer.line_count
+            ret_line = self.line_count
             self.eat(RETURN)
-            ret_val = Var(self.current_token.value, self.lexer.line_count)
+            ret_val = Var(self.current_token.value, self.line_count)
             self.eat(ID)
         self.eat(RBRACKET)
 
-        return FunImpl(fun_name, args_list, Stmts(stmts_list, self.lexer.line_count),
-                       Return(ret_type, ret_val, ret_line), self.lexer.line_count)
+        return FunImpl(fun_name, args_list, Stmts(stmts_list, self.line_count),
+                       Return(ret_type, ret_val, ret_line), self.line_count)
 
     def argument_list(self):
         """
@@ -133,12 +163,12 @@ class Parser(object):
         params = []
 
         while self.current_token.type != RPAREN:
-            type_node = Type(self.current_token.value, self.lexer.line_count)
+            type_node = Type(self.current_token.value, self.line_count)
             self.eat(TYPE)
-            var_node = Var(self.current_token.value, self.lexer.line_count)
+            var_node = Var(self.current_token.value, self.line_count)
             self.eat(ID)
 
-            params.append(VarDecl(type_node, var_node, self.lexer.line_count))
+            params.append(VarDecl(type_node, var_node, self.line_count))
 
             if self.current_token.type == COMMA:
                 self.eat(COMMA)
@@ -156,19 +186,23 @@ class Parser(object):
                                     | empty
         """
         statements = []
+        kind = self.current_token.type
+        if kind not in STATEMENT_STARTS:
+            # callers loop until a closing token, so nothing consumed here would never terminate
+            self.error('statement', kind)
 
-        if self.current_token.type == TYPE:
+        if kind == TYPE:
             statements.extend(self.var_declaration_list())
-        elif self.current_token.type == ID:
-            var_node = Var(self.current_token.value, self.lexer.line_count)
+        elif kind == ID:
+            var_node = Var(self.current_token.value, self.line_count)
             self.eat(ID)
             while self.current_token.type == ASSIGN:
                 statements.append(self.var_assignment_statement(var_node))
-        elif self.current_token.type == COND:
+        elif kind == COND:
             statements.append(self.condition_statement())
-        elif self.current_token.type == LOOP:
+        elif kind == LOOP:
             statements.append(self.loop_statement())
-        elif self.current_token.type == MONKEY:
+        else:
             statements.append(self.function_call())
 
         return statements
@@ -181,9 +215,9 @@ class Parser(object):
         declarations = []
 
         while self.current_token.type == TYPE:
-            type_node = Type(self.current_token.value, self.lexer.line_count)
+            type_node = Type(self.current_token.value, self.line_count)
             self.eat(TYPE)
-            var_node = Var(self.current_token.value, self.lexer.line_count)
+            var_node = Var(self.current_token.value, self.line_count)
             self.eat(ID)
 
             declarations.extend(self.var_declaration(type_node, var_node))
@@ -197,13 +231,13 @@ class Parser(object):
         self.eat(ASSIGN)
 
         if self.is_bool_expr():
-            return Assign(var_node, self.bool_expr(), self.lexer.line_count)
+            return Assign(var_node, self.bool_expr(), self.line_count)
         elif self.current_token.type == STRING:
-            return Assign(var_node, self.string_expr(), self.lexer.line_count)
+            return Assign(var_node, self.string_expr(), self.line_count)
         elif self.current_token.type == MONKEY:
-            return Assign(var_node, self.function_call(), self.lexer.line_count)
+            return Assign(var_node, self.function_call(), self.line_count)
         else:
-            return Assign(var_node, self.expr(), self.lexer.line_count)
+            return Assign(var_node, self.expr(), self.line_count)
 
     def condition_statement(self):
         """
@@ -225,9 +259,9 @@ class Parser(object):
             statement_list.extend(self.statement_list())
 
         if len(statement_list) == 0:
-            raise Exception('Error: Expected block in condition statement.\nLine: {}'.format(self.lexer.line_count))
+            raise Exception('Error: Expected block in condition statement.\nLine: {}'.format(self.line_count))
 
-        node = Cond(cond, Stmts(statement_list, self.lexer.line_count), self.lexer.line_count)
+        node = Cond(cond, Stmts(statement_list, self.line_count), self.line_count)
         self.eat(RBRACKET)
 
         return node
@@ -249,9 +283,9 @@ class Parser(object):
             statement_list.extend(self.statement_list())
 
         if len(statement_list) == 0:
-            raise Exception('Error: Expected block in loop statement.\nLine: {}'.format(self.lexer.line_count))
+            raise Exception('Error: Expected block in loop statement.\nLine: {}'.format(self.line_count))
 
-        node = Loop(cond, Stmts(statement_list, self.lexer.line_count), self.lexer.line_count)
+        node = Loop(cond, Stmts(statement_list, self.line_count), self.line_count)
         self.eat(RBRACKET)
 
         return node
@@ -272,22 +306,22 @@ class Parser(object):
         args = []
         while self.current_token.type != RPAREN:
             if self.current_token.type == STRING:
-                var_node = Var(self.current_token.value, self.lexer.line_count)
+                var_node = Var(self.current_token.value, self.line_count)
                 self.eat(STRING)
             elif self.current_token.type == INTEGER:
-                var_node = Var(self.current_token.value, self.lexer.line_count)
+                var_node = Var(self.current_token.value, self.line_count)
                 self.eat(INTEGER)
             elif self.current_token.type == INT:
-                var_node = Var(self.current_token.value, self.lexer.line_count)
+                var_node = Var(self.current_token.value, self.line_count)
                 self.eat(INT)
             else:
-                var_node = Var(self.current_token.value, self.lexer.line_count)
+                var_node = Var(self.current_token.value, self.line_count)
                 self.eat(ID)
             args.append(var_node)
             if self.current_token.type == COMMA:
                 self.eat(COMMA)
 
-        line_cnt = self.lexer.line_count
+        line_cnt = self.line_count
         self.eat(RPAREN)
         return FunCall(lib_name, func_name, args, line_cnt)
 
@@ -297,10 +331,10 @@ class Parser(object):
         """
         declarations = []
 
-        declarations.append(VarDecl(type_node, var_node, self.lexer.line_count))
+        declarations.append(VarDecl(type_node, var_node, self.line_count))
         if self.current_token.type == ASSIGN:
             self.eat(ASSIGN)
-            declarations.append(Assign(var_node, self.expr(), self.lexer.line_count))
+            declarations.append(Assign(var_node, self.expr(), self.line_count))
 
         return declarations
 
@@ -319,13 +353,20 @@ class Parser(object):
 
         if token.type == INT:
             self.eat(INT)
-            return Num(token, self.lexer.line_count)
+            return Num(token, self.line_count)
         elif token.type == FLOAT:
             self.eat(FLOAT)
-            return Num(token, self.lexer.line_count)
+            return Num(token, self.line_count)
         elif token.type == MINUS:
-            self.eat(MINUS)
-            return UnOp(token, self.expr(), self.lexer.line_count)
+            # a run of signs is collected in a loop, so it does not nest a call per sign
+            signs = []
+            while self.current_token.type == MINUS:
+                signs.append(self.current_token)
+                self.eat(MINUS)
+            node = self.factor()
+            for sign in reversed(signs):
+                node = UnOp(sign, node, self.line_count)
+            return node
         elif token.type == LPAREN:
             self.eat(LPAREN)
             node = self.expr()
@@ -335,47 +376,30 @@ class Parser(object):
             return self.function_call()
         elif token.type == ID:
             self.eat(ID)
-            return Var(token.value, self.lexer.line_count)
+            return Var(token.value, self.line_count)
 
     def term(self):
         """
         term                        : factor ((MUL | NDIV | DIV | MOD) factor)*
         """
-        node = self.factor()
-
-        while self.current_token.type in (MUL, NDIV, DIV, MOD):
-            token = self.current_token
-            if token.type == MUL:
-                self.eat(MUL)
-            elif token.type == NDIV:
-                self.eat(NDIV)
-            elif token.type == DIV:
-                self.eat(DIV)
-            elif token.type == MOD:
-                self.eat(MOD)
-            else:
-                self.error('*, /, // or %', token.type)
-
-            node = BinOp(left=node, op=token, right=self.factor(), line_number=self.lexer.line_count)
+        return self.expr(MULTIPLICATIVE_LEVEL)
 
-        return node
-
-    def expr(self):
+    def expr(self, level=ADDITIVE_LEVEL):
         """
         expr                        : term ((PLUS | MINUS) term)*
+
+        Precedence climbing over the levels in PRECEDENCE: operators of the same level are folded in a loop,
+        giving left associative trees, and the right operand only parses operators binding tighter. The call
+        depth is bounded by the number of levels, not by the length of the expression.
         """
-        node = self.term()
+        node = self.factor()
 
-        while self.current_token.type in (PLUS, MINUS):
+        while PRECEDENCE.get(self.current_token.type, 0) >= level:
             token = self.current_token
-            if token.type == PLUS:
-                self.eat(PLUS)
-            elif token.type == MINUS:
-                self.eat(MINUS)
-            else:
-                self.error('+ or -', self.current_token.type)
+            self.eat(token.type)
 
-            node = BinOp(left=node, op=token, right=self.expr(), line_number=self.lexer.line_count)
+            node = BinOp(left=node, op=token, right=self.expr(PRECEDENCE[token.type] + 1),
+                         line_number=self.line_count)
 
         return node
 
@@ -386,7 +410,7 @@ class Parser(object):
         string_value = self.current_token.value
         self.eat(STRING)
 
-        return String(string_value, self.lexer.line_count)
+        return String(string_value, self.line_count)
 
     def bool_expr(self):
         """
@@ -405,12 +429,12 @@ class Parser(object):
         """
         left = self.expr()
         op = self.current_token
-        if op.type in (LESS, LESS_EQ, GREATER, GREATER_EQ, EQUAL, NOT_EQUAL):
+        if op.type in COMPARISON_OPS:
             self.eat(op.type)
         else:
             self.error('comparison operator', op.type)
 
-        return BinOp(left, op, self.expr(), self.lexer.line_count)
+        return BinOp(left, op, self.expr(), self.line_count)
 
     def bool_logical_expr(self):
         """
@@ -423,7 +447,7 @@ class Parser(object):
             node = self.bool_comparison_expr()
             self.eat(RPAREN)
 
-        while self.current_token.type in (AND, OR):
+        while self.current_token.type in LOGICAL_OPS:
             token = self.current_token
             self.eat(self.current_token.type)
 
@@ -431,13 +455,13 @@ class Parser(object):
                 un_token = self.current_token
                 self.eat(NOT)
                 self.eat(LPAREN)
-                node = BinOp(node, token, UnOp(un_token, self.bool_comparison_expr(), self.lexer.line_count),
-                             self.lexer.line_count)
+                node = BinOp(node, token, UnOp(un_token, self.bool_comparison_expr(), self.line_count),
+                             self.line_count)
                 self.eat(RPAREN)
 
             else:
                 self.eat(LPAREN)
-                node = BinOp(node, token, self.bool_comparison_expr(), self.lexer.line_count)
+                node = BinOp(node, token, self.bool_comparison_expr(), self.line_count)
                 self.eat(RPAREN)
 
         return node
@@ -452,17 +476,18 @@ class Parser(object):
         node = self.bool_expr()
         self.eat(RPAREN)
 
-        return UnOp(token, node, self.lexer.line_count)
+        return UnOp(token, node, self.line_count)
 
     @restorable
     def is_bool_expr(self):
         """
         Checks if the following expression is boolean (has logical, comparison or unar operators).
-        It is restorable, therefore does not remember the state.
+        It is restorable, therefore does not remember the state: the token stream is reset to the mark taken
+        before the scan, so the cost is proportional to the lookahead only.
         """
         res = False
-        while self.current_token.type not in [ASSIGN, MONKEY, EOF, RBRACKET, COND, LOOP]:
-            if self.current_token.type in (LESS, LESS_EQ, GREATER, GREATER_EQ, EQUAL, NOT_EQUAL, AND, OR, NOT):
+        while self.current_token.type not in BOOL_SCAN_STOPS:
+            if self.current_token.type in BOOL_OPS:
                 res = True
                 self.eat(self.current_token.type)
                 break
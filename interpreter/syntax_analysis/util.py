@@ -1,13 +1,14 @@
 from functools import wraps
-import pickle
 
 
 def restorable(fn):
     @wraps(fn)
     def wrapper(self, *args, **kwargs):
-        state = pickle.dumps(self.__dict__)
-        result = fn(self, *args, **kwargs)
-        self.__dict__ = pickle.loads(state)
+        mark = self.tokens.mark()
+        try:
+            result = fn(self, *args, **kwargs)
+        finally:
+            self.current_token = self.tokens.reset(mark)
         return result
 
     return wrapper
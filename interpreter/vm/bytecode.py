@@ -0,0 +1,242 @@
+import operator
+from array import array
+
+from interpreter.compilation.lowering import string_value
+from interpreter.lexical_analysis.tokenType import *
+from interpreter.semantic_analysis.analyzer import analyze, is_variable
+from interpreter.syntax_analysis.interpreter import NodeVisitor, FunCall, Num, left_spine
+
+# opcodes, every instruction is an opcode followed by one argument in Function.code
+LOAD_VAR = 0
+LOAD_CONST = 1
+STORE_VAR = 2
+BINARY = 3
+JUMP_IF_FALSE = 4
+JUMP = 5
+CALL_LIBRARY = 6
+CALL_FUNCTION = 7
+POP = 8
+JUMP_IF_FALSE_OR_POP = 9
+JUMP_IF_TRUE_OR_POP = 10
+NOT_OP = 11
+NEGATE = 12
+RETURN_VALUE = 13
+
+OPNAMES = ['LOAD_VAR', 'LOAD_CONST', 'STORE_VAR', 'BINARY', 'JUMP_IF_FALSE', 'JUMP', 'CALL_LIBRARY', 'CALL_FUNCTION',
+           'POP', 'JUMP_IF_FALSE_OR_POP', 'JUMP_IF_TRUE_OR_POP', 'NOT', 'NEGATE', 'RETURN_VALUE']
+
+# argument of BINARY is the index of the operation
+BINARY_OPERATORS = [operator.add, operator.sub, operator.mul, operator.truediv, operator.floordiv, operator.mod,
+                    operator.lt, operator.le, operator.gt, operator.ge, operator.eq, operator.ne]
+BINARY_CODES = {
+    PLUS: 0, MINUS: 1, MUL: 2, NDIV: 3, DIV: 4, MOD: 5,
+    LESS: 6, LESS_EQ: 7, GREATER: 8, GREATER_EQ: 9, EQUAL: 10, NOT_EQUAL: 11,
+}
+
+# library functions callable with CALL_LIBRARY, the argument is the index in this list
+LIBRARY_FUNCTIONS = [
+    ('Stdio', 'inINT', 0), ('Stdio', 'inSTRING', 0), ('Stdio', 'out', 1),
+    ('String', 'equals', 2), ('String', 'size', 1), ('String', 'get', 2), ('String', 'notEqual', 2),
+    ('String', 'isDigit', 1), ('String', 'isLetter', 1), ('String', 'isSpace', 1),
+    ('String', 'isInterpunction', 1), ('String', 'substring', 3), ('String', 'toUpper', 1),
+    ('Random', 'range', 2), ('Math', 'sqrt', 1),
+    ('Arrays', 'init', 0), ('Arrays', 'append', 2), ('Arrays', 'size', 1), ('Arrays', 'get', 2),
+    ('Number', 'isInteger', 1), ('Number', 'toString', 1),
+    ('FileUtil', 'read', 1),
+]
+LIBRARY_CODES = {(lib_name, fun_name): i for i, (lib_name, fun_name, _) in enumerate(LIBRARY_FUNCTIONS)}
+
+
+class Function(object):
+    __slots__ = ('name', 'code', 'consts', 'const_indexes', 'slots', 'arg_types', 'ret_type', 'var_types')
+
+    def __init__(self, name, scope, arg_types=(), ret_type=''):
+        self.name = name
+        self.code = array('l')
+        self.consts = []
+        self.const_indexes = {}
+        # variable name -> slot, in the order the scope declares them, parameters first
+        self.slots = {name: slot for slot, name in enumerate(scope.symbols)}
+        self.arg_types = list(arg_types)
+        self.ret_type = ret_type
+        self.var_types = {name: symbol.type for name, symbol in scope.symbols.items()}
+
+    def emit(self, opcode, arg=0):
+        self.code.append(opcode)
+        self.code.append(arg)
+        return len(self.code) - 1
+
+    def const(self, value):
+        # 1 and 1.0 are equal keys, the type keeps them apart
+        key = (type(value), value)
+        if key not in self.const_indexes:
+            self.const_indexes[key] = len(self.consts)
+            self.consts.append(value)
+        return self.const_indexes[key]
+
+    def disassemble(self):
+        lines = ['{}({}):'.format(self.name, ', '.join(list(self.slots)[:len(self.arg_types)]))]
+        names = {slot: name for name, slot in self.slots.items()}
+        for pc in range(0, len(self.code), 2):
+            opcode, arg = self.code[pc], self.code[pc + 1]
+            detail = ''
+            if opcode in (LOAD_VAR, STORE_VAR):
+                detail = names[arg]
+            elif opcode == LOAD_CONST:
+                detail = repr(self.consts[arg])
+            elif opcode == BINARY:
+                detail = BINARY_OPERATORS[arg].__name__
+            elif opcode == CALL_LIBRARY:
+                detail = '{}.{}'.format(*LIBRARY_FUNCTIONS[arg][:2])
+            lines.append('{:>6} {:<22} {:>4} {}'.format(pc, OPNAMES[opcode], arg, detail))
+        return '\n'.join(lines)
+
+
+class BytecodeProgram(object):
+    def __init__(self, main_scope):
+        self.main = Function('main', main_scope)
+        self.functions = []
+        self.function_indexes = {}
+
+
+class BytecodeCompiler(NodeVisitor):
+    """
+    Lowers a syntax tree checked by analyze to stack bytecode, with the variables the Analysis resolved
+    turned into slots of their function.
+    """
+
+    def __init__(self, analysis):
+        self.analysis = analysis
+        self.program = BytecodeProgram(analysis.symbols.main)
+        self.function = self.program.main
+
+    def compile(self, tree):
+        self.visit(tree)
+        self.program.main.emit(LOAD_CONST, self.program.main.const(None))
+        self.program.main.emit(RETURN_VALUE)
+        return self.program
+
+    def statement(self, node):
+        self.visit(node)
+        if isinstance(node, FunCall):
+            self.function.emit(POP)
+
+    def slot(self, node):
+        return self.function.slots[self.analysis.symbol(node).name]
+
+    def visit_Program(self, node):
+        for child in node.children:
+            self.statement(child)
+
+    def visit_Library(self, node):
+        pass
+
+    def visit_FunImpl(self, node):
+        symbol = self.analysis.functions[node]
+        function = Function(node.fun_name, symbol.scope, symbol.arg_types, symbol.ret_type)
+        self.program.function_indexes[node.fun_name] = len(self.program.functions)
+        self.program.functions.append(function)
+
+        self.function = function
+        self.visit(node.stmts_node)
+        self.visit(node.ret_node)
+        self.function = self.program.main
+
+    def visit_Return(self, node):
+        self.visit(node.var_node)
+        self.function.emit(RETURN_VALUE)
+
+    def visit_Stmts(self, node):
+        for child in node.stmts:
+            self.statement(child)
+
+    def visit_Cond(self, node):
+        self.visit(node.bool_expr)
+        jump = self.function.emit(JUMP_IF_FALSE)
+        self.visit(node.stmts_node)
+        self.function.code[jump] = len(self.function.code)
+
+    def visit_Loop(self, node):
+        start = len(self.function.code)
+        self.visit(node.bool_expr)
+        jump = self.function.emit(JUMP_IF_FALSE)
+        self.visit(node.stmts_node)
+        self.function.emit(JUMP, start)
+        self.function.code[jump] = len(self.function.code)
+
+    def visit_VarDecl(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        slot = self.slot(node.var_node)
+        if self.analysis.type_of(node.var_node) == 'INT' and isinstance(node.expr, Num):
+            self.function.emit(LOAD_CONST, self.function.const(int(node.expr.value)))
+        else:
+            self.visit(node.expr)
+        self.function.emit(STORE_VAR, slot)
+
+    def visit_Type(self, node):
+        pass
+
+    def visit_Var(self, node):
+        if is_variable(node):
+            self.function.emit(LOAD_VAR, self.slot(node))
+        else:
+            self.function.emit(LOAD_CONST, self.function.const(string_value(str(node.var))))
+
+    def visit_String(self, node):
+        self.function.emit(LOAD_CONST, self.function.const(string_value(node.value)))
+
+    def visit_Num(self, node):
+        self.function.emit(LOAD_CONST, self.function.const(node.value))
+
+    def visit_BinOp(self, node):
+        spine, left = left_spine(node)
+        self.visit(left)
+        for binop in reversed(spine):
+            if binop.op.type in (AND, OR):
+                jump = self.function.emit(JUMP_IF_FALSE_OR_POP if binop.op.type == AND else JUMP_IF_TRUE_OR_POP)
+                self.visit(binop.right)
+                self.function.code[jump] = len(self.function.code)
+            else:
+                self.visit(binop.right)
+                self.function.emit(BINARY, BINARY_CODES[binop.op.type])
+
+    def visit_UnOp(self, node):
+        self.visit(node.bool_expr)
+        self.function.emit(NOT_OP if node.token.type == NOT else NEGATE)
+
+    def visit_FunCall(self, node):
+        if node.lib_name == 'This':
+            self.function_call(node)
+        elif node.lib_name == 'String' and node.fun_name == 'append':
+            # statement in the generated code: first = first + second
+            self.visit(node.args_nodes[0])
+            self.visit(node.args_nodes[1])
+            self.function.emit(BINARY, BINARY_CODES[PLUS])
+            self.function.emit(STORE_VAR, self.slot(node.args_nodes[0]))
+            self.function.emit(LOAD_CONST, self.function.const(None))
+        elif node.lib_name == 'Arrays' and node.fun_name == 'init':
+            self.function.emit(CALL_LIBRARY, LIBRARY_CODES[('Arrays', 'init')])
+            self.function.emit(STORE_VAR, self.slot(node.args_nodes[0]))
+            self.function.emit(LOAD_CONST, self.function.const(None))
+        elif (node.lib_name, node.fun_name) in LIBRARY_CODES:
+            code = LIBRARY_CODES[(node.lib_name, node.fun_name)]
+            for child in node.args_nodes[:LIBRARY_FUNCTIONS[code][2]]:
+                self.visit(child)
+            self.function.emit(CALL_LIBRARY, code)
+        else:
+            raise Exception('Function {}.{} is not supported.\nLine: {}'
+                            .format(node.lib_name, node.fun_name, node.line_number))
+
+    def function_call(self, node):
+        for child in node.args_nodes:
+            self.visit(child)
+        self.function.emit(CALL_FUNCTION, self.program.function_indexes[node.fun_name])
+
+
+def compile_tree(tree):
+    """
+    Checks the tree with analyze, raising its first semantic error, and lowers it to a BytecodeProgram.
+    """
+    return BytecodeCompiler(analyze(tree)).compile(tree)
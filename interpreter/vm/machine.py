@@ -0,0 +1,149 @@
+import math
+import operator
+import random
+import sys
+
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.vm.bytecode import *
+
+# value of variables that were declared but never assigned
+UNSET = object()
+
+INTERPUNCTION = [',', '.', ':', '?', '!', ';']
+
+
+class VirtualMachine(object):
+    """
+    Executes bytecode programs, reading Stdio input from stdin and writing output to stdout.
+    """
+
+    def __init__(self, program, stdin=None, stdout=None):
+        self.program = program
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.stdout = stdout if stdout is not None else sys.stdout
+
+        implementations = {
+            ('Stdio', 'inINT'): lambda: int(self.input()),
+            ('Stdio', 'inSTRING'): self.input,
+            ('Stdio', 'out'): self.print,
+            ('String', 'equals'): operator.eq,
+            ('String', 'size'): len,
+            ('String', 'get'): lambda s, i: s[int(i)],
+            ('String', 'notEqual'): operator.ne,
+            ('String', 'isDigit'): lambda c: int(c.isdigit()),
+            ('String', 'isLetter'): lambda c: int(c.isalpha()),
+            ('String', 'isSpace'): lambda c: int(c.isspace()),
+            ('String', 'isInterpunction'): lambda c: int(c in INTERPUNCTION),
+            ('String', 'substring'): lambda s, start, end: s[start:end],
+            ('String', 'toUpper'): lambda s: s.upper(),
+            ('Random', 'range'): lambda start, end: random.randrange(int(start), int(end)),
+            ('Math', 'sqrt'): math.sqrt,
+            ('Arrays', 'init'): list,
+            ('Arrays', 'append'): lambda array, value: array.append(value),
+            ('Arrays', 'size'): len,
+            ('Arrays', 'get'): lambda array, i: array[int(i)],
+            ('Number', 'isInteger'): float.is_integer,
+            ('Number', 'toString'): str,
+            ('FileUtil', 'read'): lambda path: open(path, 'r').read(),
+        }
+        self.library = [(implementations[(lib_name, fun_name)], argc)
+                        for lib_name, fun_name, argc in LIBRARY_FUNCTIONS]
+
+    def input(self):
+        line = self.stdin.readline()
+        if not line:
+            raise EOFError('EOF when reading a line')
+        return line[:-1] if line.endswith('\n') else line
+
+    def print(self, value):
+        print(value, file=self.stdout)
+
+    def run(self):
+        """
+        Runs the main program and returns its variables by name.
+        """
+        main = self.program.main
+        variables = [UNSET] * len(main.slots)
+        self.execute(main, variables)
+        return {name: variables[slot] for name, slot in main.slots.items() if variables[slot] is not UNSET}
+
+    def execute(self, function, variables):
+        code = function.code
+        consts = function.consts
+        functions = self.program.functions
+        library = self.library
+        binary_operators = BINARY_OPERATORS
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        while True:
+            opcode = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+
+            if opcode == LOAD_VAR:
+                value = variables[arg]
+                if value is UNSET:
+                    raise NameError('name \'{}\' is not defined'.format(
+                        next(name for name, slot in function.slots.items() if slot == arg)))
+                push(value)
+            elif opcode == LOAD_CONST:
+                push(consts[arg])
+            elif opcode == BINARY:
+                right = pop()
+                stack[-1] = binary_operators[arg](stack[-1], right)
+            elif opcode == STORE_VAR:
+                variables[arg] = pop()
+            elif opcode == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif opcode == JUMP:
+                pc = arg
+            elif opcode == CALL_LIBRARY:
+                implementation, argc = library[arg]
+                if argc:
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                    push(implementation(*args))
+                else:
+                    push(implementation())
+            elif opcode == POP:
+                pop()
+            elif opcode == JUMP_IF_FALSE_OR_POP:
+                if not stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif opcode == JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif opcode == NOT_OP:
+                stack[-1] = not stack[-1]
+            elif opcode == NEGATE:
+                stack[-1] = -stack[-1]
+            elif opcode == CALL_FUNCTION:
+                callee = functions[arg]
+                argc = len(callee.arg_types)
+                callee_variables = [UNSET] * len(callee.slots)
+                if argc:
+                    callee_variables[:argc] = stack[-argc:]
+                    del stack[-argc:]
+                push(self.execute(callee, callee_variables))
+            elif opcode == RETURN_VALUE:
+                return pop()
+
+
+def compile_source(text):
+    return compile_tree(Parser(Lexer(text)).parse())
+
+
+def run(text, stdin=None, stdout=None):
+    """
+    Compiles the nonek source to bytecode and runs it, returns the variables of the main program.
+    """
+    return VirtualMachine(compile_source(text), stdin, stdout).run()
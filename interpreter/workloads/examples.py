@@ -0,0 +1,25 @@
+import os
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'examples', 'test_files')
+TEXT = 'Ovo je, recenica: sa 7 reci? i znakovima! '
+
+
+def inputs(size, text_file):
+    """
+    Standard input for every example, sized so that its loops run about size iterations.
+    """
+    with open(text_file, 'w') as f:
+        f.write(TEXT * (size // len(TEXT) + 1))
+
+    return {
+        'e01': '180\nM\n',
+        'e02': '9' * min(size, 4000) + '\n',
+        'e03': '1\n7\n3\n4\n',
+        'e04': ''.join('{}\n'.format(i) for i in range(1, size)) + '0\n',
+        'e05': '{}\n'.format(size),
+        'e06': ''.join('{}\n'.format(i) for i in range(1, size)) + '0\n',
+        'e07': ('ab12' * size)[:size] + '\n',
+        'e08': 'x' * int(size ** 0.5) + '\n',
+        'e09': (TEXT * (size // len(TEXT) + 1)) + '\n3\n',
+        'e10': '{}\n3\nje\nsa\ni\n'.format(text_file),
+    }
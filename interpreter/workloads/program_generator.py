@@ -0,0 +1,123 @@
+import random
+
+COMPARISONS = ('<', '>', '<=', '>=', '==', '!=')
+OPERATORS = ('+', '-', '*')
+# literal divisors only, so the generated programs never divide by zero
+DIVISIONS = ('DIV 3', 'MOD 7')
+INDENT = '    '
+
+
+class ProgramGenerator(object):
+    """
+    Writes valid nonek programs of a given shape: functions taking two INT arguments and calling only the
+    functions before them, COND and LOOP statements nested up to depth, expressions of expression operands
+    and variables INT variables per scope. Every LOOP counts a variable of its own down from a small number,
+    so the programs also terminate when run.
+    """
+
+    def __init__(self, functions=10, depth=3, expression=4, variables=8, seed=0):
+        self.functions = functions
+        self.depth = depth
+        self.expression = expression
+        self.variables = ['v{}'.format(i) for i in range(max(variables, 2))]
+        self.counters = ['l{}'.format(i) for i in range(depth)]
+        self.rnd = random.Random(seed)
+        self.lines = []
+
+    def generate(self, lines=1000):
+        """
+        Returns the source of a program of about lines lines, split evenly between the functions and
+        Execution.
+        """
+        self.lines = ['Libraries {', '-> Stdio', '}', '', 'Functions {', '']
+        share = lines // (self.functions + 1)
+        for index in range(self.functions):
+            self.function(index, len(self.lines) + share)
+        self.lines.extend(['}', '', 'Execution {'])
+        self.declarations(1, self.variables + self.counters)
+        self.block(1, self.functions, end=lines - 1)
+        self.lines.append('}')
+        return '\n'.join(self.lines) + '\n'
+
+    def function(self, index, end):
+        self.lines.append('@f{}: (INT a, INT b) -> INT {{'.format(index))
+        self.declarations(1, self.variables + self.counters)
+        self.lines.append('{}#v1 = #a + #b'.format(INDENT))
+        self.block(1, index, end=end - 2)
+        self.lines.extend(['{}RETURN #v0'.format(INDENT), '}', ''])
+
+    def declarations(self, level, names):
+        for name in names:
+            self.lines.append('{}INT {}'.format(INDENT * level, name))
+        for value, name in enumerate(names):
+            self.lines.append('{}#{} = {}'.format(INDENT * level, name, value))
+
+    def block(self, level, callable_functions, end=None, count=None):
+        # a body is filled until the program reaches the line end, a nested block gets count statements
+        written = 0
+        while len(self.lines) < end if count is None else written < count:
+            # the first statement of a block nests further half of the time, so the full depth is reached
+            if level <= self.depth and self.rnd.random() < (0.5 if written == 0 else 0.2):
+                self.compound(level, callable_functions)
+            else:
+                self.simple(level, callable_functions)
+            written += 1
+
+    def compound(self, level, callable_functions):
+        indent = INDENT * level
+        if self.rnd.random() < 0.5:
+            self.lines.append('{}COND: ({}) -> {{'.format(indent, self.condition()))
+            self.block(level + 1, callable_functions, count=self.rnd.randint(1, 4))
+        else:
+            counter = self.counters[level - 1]
+            self.lines.append('{}#{} = {}'.format(indent, counter, self.rnd.randint(1, 3)))
+            self.lines.append('{}LOOP: (#{} > 0) -> {{'.format(indent, counter))
+            self.block(level + 1, callable_functions, count=self.rnd.randint(1, 4))
+            self.lines.append('{}#{} = #{} - 1'.format(INDENT * (level + 1), counter, counter))
+        self.lines.append('{}}}'.format(indent))
+
+    def simple(self, level, callable_functions):
+        indent = INDENT * level
+        r = self.rnd.random()
+        if r < 0.1:
+            self.lines.append('{}@Stdio.out(#{})'.format(indent, self.variable()))
+        elif r < 0.2 and callable_functions:
+            self.lines.append('{}#{} = @This.f{}(#{}, #{})'.format(indent, self.variable(),
+                                                                   self.rnd.randrange(callable_functions),
+                                                                   self.variable(), self.variable()))
+        else:
+            # the modulo keeps the values small, however long the programs run
+            self.lines.append('{}#{} = ({}) MOD 997'.format(indent, self.variable(), self.expr()))
+
+    def variable(self):
+        return self.rnd.choice(self.variables)
+
+    def operand(self):
+        if self.rnd.random() < 0.6:
+            return '#' + self.variable()
+        return str(self.rnd.randint(0, 99))
+
+    def expr(self):
+        parts = [self.operand()]
+        for _ in range(self.expression - 1):
+            r = self.rnd.random()
+            if r < 0.1:
+                parts.append(self.rnd.choice(DIVISIONS))
+            elif r < 0.2:
+                parts.append('{} ({} + {})'.format(self.rnd.choice(OPERATORS), self.operand(), self.operand()))
+            else:
+                parts.append('{} {}'.format(self.rnd.choice(OPERATORS), self.operand()))
+        return ' '.join(parts)
+
+    def comparison(self):
+        return '({} {} {})'.format(self.expr(), self.rnd.choice(COMPARISONS), self.operand())
+
+    def condition(self):
+        if self.rnd.random() < 0.5:
+            return self.comparison()
+        return '{} {} {}'.format(self.comparison(), self.rnd.choice(('AND', 'OR')), self.comparison())
+
+
+def generate(lines=1000, functions=10, depth=3, expression=4, variables=8, seed=0):
+    return ProgramGenerator(functions, depth, expression, variables, seed).generate(lines)
+
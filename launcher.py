@@ -0,0 +1,21 @@
+import sys
+
+from interpreter.compilation.codefile import load_code
+
+USAGE = 'usage: launcher.py code.pyc [source.nk]'
+
+
+def main():
+    # short lived programs start here, so argparse and the compiler are not imported
+    if len(sys.argv) not in (2, 3):
+        sys.exit(USAGE)
+    text = None
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], 'r') as f:
+            text = f.read()
+    code = load_code(sys.argv[1], text)
+    exec(code, {'__name__': '__main__', '__builtins__': __builtins__})
+
+
+if __name__ == '__main__':
+    main()
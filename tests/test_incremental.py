@@ -0,0 +1,111 @@
+import glob
+import os
+
+import pytest
+
+from interpreter.lexical_analysis.regexLexer import RegexLexer
+from interpreter.lexical_analysis.token import Token
+from interpreter.syntax_analysis.incremental import Document
+from interpreter.syntax_analysis.interpreter import AST, iter_fields
+from interpreter.syntax_analysis.parser import Parser
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples', 'test_files')
+
+
+def example(name):
+    with open(os.path.join(EXAMPLES, name), 'r') as f:
+        return f.read()
+
+
+def dump(node):
+    # the tree as nested tuples with the line of every node, so line shifts are compared too
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    if isinstance(node, Token):
+        return node.type, node.value
+    if isinstance(node, AST):
+        return (type(node).__name__, node.line_number) + tuple(dump(value) for _, value in iter_fields(node))
+    return node
+
+
+def full_parse(text):
+    return dump(Parser(RegexLexer(text)).parse())
+
+
+def check(document):
+    assert document.error is None
+    assert dump(document.tree) == full_parse(document.text)
+
+
+def apply(text, edits):
+    document = Document(text)
+    for offset, deleted, inserted in edits:
+        document.edit(offset, deleted, inserted)
+        check(document)
+    return document
+
+
+@pytest.mark.parametrize('name', sorted(os.path.basename(path) for path in glob.glob(os.path.join(EXAMPLES, 'e*'))))
+def test_whole_text(name):
+    check(Document(example(name)))
+
+
+def test_whitespace_edit_reparses_nothing():
+    text = example('e03')
+    offset = text.index('#b = @Stdio.inINT()')
+    document = apply(text, [(offset, 0, '  ')])
+    assert document.reparsed == []
+
+
+def test_edit_inside_statement():
+    text = example('e03')
+    offset = text.index('#b = @Stdio.inINT()')
+    apply(text, [(offset, 2, '#c'), (offset + 5, 0, '1 + '), (offset, 2, '#b')])
+
+
+def test_edits_changing_the_line_count():
+    text = example('e03')
+    offset = text.index('#c = @Stdio.inINT()')
+    apply(text, [(offset, 0, '#a = 1\n    '), (offset, 0, '\n\n'), (offset, 3, '')])
+
+
+def test_chained_assignment_is_shifted_once():
+    # the parser shares one Var node between the assignments of #i = 3 = @Stdio.inINT()
+    text = example('e03')
+    apply(text, [(160, 1, '\n#i = 3\n'), (153, 2, '#a')])
+
+
+def test_lines_added_in_and_before_a_function():
+    with open(os.path.join(EXAMPLES, '..', 'test1.txt'), 'r') as f:
+        text = f.read()
+    offset = text.index('#m = #a')
+    apply(text, [(offset, 0, '#m = #b\n    '), (0, 0, '\n\n\n'), (offset + 3, 0, '\n')])
+
+
+def test_error_recovery():
+    text = example('e03')
+    offset = text.index('#b = @Stdio.inINT()')
+    document = Document(text)
+    document.edit(offset, 0, 'COND ')
+    assert document.tree is None and document.error is not None
+    document.edit(offset, 5, '')
+    check(document)
+
+    # a character no token starts with fails in the lexer instead of the parser
+    document.edit(offset, 0, '$')
+    assert document.tree is None and document.error is not None
+    document.edit(offset, 1, '')
+    check(document)
+
+
+def test_edit_emptying_a_block():
+    # the edited statement is the only one of the COND, which a full parse rejects as an empty block
+    text = example('e03')
+    offset = text.index('#max = #b')
+    document = Document(text)
+    document.edit(offset + 5, 1, 'x')
+    with pytest.raises(Exception) as error:
+        Parser(RegexLexer(document.text)).parse()
+    assert document.tree is None and document.error == str(error.value)
+    document.edit(offset + 5, 1, '=')
+    check(document)
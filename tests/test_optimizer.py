@@ -0,0 +1,253 @@
+import io
+import os
+import random
+
+import pytest
+
+from interpreter.compilation import runner
+from interpreter.compilation.python_source import compile_source
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.optimization.optimizer import MAX_LEVEL, optimize
+from interpreter.semantic_analysis.analyzer import analyze
+from interpreter.syntax_analysis.interpreter import Assign, BinOp, Num
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.workloads.examples import EXAMPLES, inputs
+from interpreter.workloads.program_generator import generate
+
+LEVELS = range(MAX_LEVEL + 1)
+BACKENDS = runner.BACKENDS
+
+
+def program(execution, functions=''):
+    return ('Libraries {{\n-> Stdio\n-> String\n}}\n\nFunctions {{\n{}\n}}\n\nExecution {{\n{}\n}}\n'
+            .format(functions, execution))
+
+
+def output(source, optimize=0, backend='source', stdin=''):
+    stdout = io.StringIO()
+    runner.run(source, io.StringIO(stdin), stdout, optimize=optimize, backend=backend)
+    return stdout.getvalue().split()
+
+
+# an inner loop writing the variable of the outer loop
+NESTED_WRITES_VARIABLE = program('''
+    INT i
+    #i = 0
+    LOOP: (#i < 10) -> {
+        @Stdio.out(#i)
+        LOOP: (#i < 5) -> {
+            #i = #i + 1
+        }
+        #i = #i + 1
+    }
+''')
+# an inner loop counting the bound of the outer loop
+NESTED_WRITES_BOUND = program('''
+    INT i
+    INT n
+    #i = 0
+    #n = 3
+    LOOP: (#i < #n) -> {
+        @Stdio.out(#i)
+        LOOP: (#n < 7) -> {
+            #n = #n + 1
+        }
+        #i = #i + 1
+    }
+''')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('level', LEVELS)
+@pytest.mark.parametrize('source, expected', [
+    (NESTED_WRITES_VARIABLE, ['0', '6', '7', '8', '9']),
+    (NESTED_WRITES_BOUND, ['0', '1', '2', '3', '4', '5', '6']),
+], ids=['variable', 'bound'])
+def test_nested_loop_writes(source, expected, level, backend):
+    assert output(source, level, backend) == expected
+
+
+# an INT variable can hold a float, so it is not lowered to range() and not indexed without int()
+FLOAT_IN_INT = program('''
+    INT i
+    INT n
+    STRING s
+    STRING c
+    #n = 7
+    #s = 'abcdefgh'
+    #i = #n / 2
+    LOOP: (#i < #n) -> {
+        @Stdio.out(#i)
+        #c = @String.get(#s, #i)
+        @Stdio.out(#c)
+        #i = #i + 1
+    }
+''')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('level', LEVELS)
+def test_float_in_int_variable(level, backend):
+    assert output(FLOAT_IN_INT, level, backend) == ['3.5', 'd', '4.5', 'e', '5.5', 'f', '6.5', 'g']
+
+
+# int bounds are used without rounding, an end other than a variable is computed once before its loop
+LOOP_BOUNDS = program('''
+    INT i
+    INT j
+    INT n
+    FLOAT f
+    #n = @Stdio.inINT()
+    #f = 2.5
+    #i = 0
+    LOOP: (#i < #n) -> {
+        #j = 0
+        LOOP: (#j <= #n - 1) -> {
+            @Stdio.out(#j)
+            #j = #j + 1
+        }
+        #i = #i + 1
+    }
+    LOOP: (#i > #f) -> {
+        #i = #i - 1
+    }
+    @Stdio.out(#i)
+''')
+
+
+def test_loop_bounds_source():
+    source = compile_source(LOOP_BOUNDS, None, optimize=1)
+    assert 'for i in __nonek_range(i, n):' in source
+    assert '__nonek_end1 = n - 1 + 1' in source
+    assert 'j = __nonek_max(j, __nonek_end1)' in source
+    assert '__nonek_end0 = __nonek_floor(f)' in source
+    assert '__nonek_ceil(' not in source
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('level', LEVELS)
+def test_loop_bounds(level, backend):
+    assert output(LOOP_BOUNDS, level, backend, '2\n') == ['0', '1', '0', '1', '2']
+
+
+# variables named like the builtins a counted loop calls, in Execution and in a function
+SHADOWED_BUILTINS = program('''
+    INT i
+    INT max
+    INT min
+    INT range
+    #max = 3
+    #range = 2
+    #i = 0
+    LOOP: (#i < #max) -> {
+        @Stdio.out(#i)
+        #i = #i + 1
+    }
+    #min = @This.count(#range)
+    @Stdio.out(#min)
+''', '''
+@count: (INT max) -> INT {
+    INT min
+    INT range
+    #min = #max
+    #range = 0
+    LOOP: (#min > 0) -> {
+        #range = #range + #min
+        #min = #min - 1
+    }
+    RETURN #range
+}
+''')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('level', LEVELS)
+def test_shadowed_builtins(level, backend):
+    assert output(SHADOWED_BUILTINS, level, backend) == ['0', '1', '2', '3']
+
+
+def optimized(execution, level=1):
+    """
+    Returns the expressions assigned by the Execution statements after optimizing at the level.
+    """
+    tree = Parser(Lexer(program(execution))).parse()
+    tree = optimize(tree, analyze(tree), level)
+    return [child.expr for child in tree.children if isinstance(child, Assign)]
+
+
+@pytest.mark.parametrize('execution, value', [
+    ('INT i\n#i = 2 + 3 * 4 - -1', 15),
+    ('FLOAT f\n#f = 7 / 2', 3.5),
+    ('INT i\n#i = 7 DIV 2 + 7 MOD 4', 6),
+    # 2 ** 63 still fits the 64 bits folded
+    ('INT i\n#i = 4294967296 * 2147483648', 2 ** 63),
+], ids=['int', 'division', 'floor division', 'largest'])
+def test_folding(execution, value):
+    expr, = optimized(execution)
+    assert isinstance(expr, Num) and type(expr.value) is type(value) and expr.value == value
+
+
+@pytest.mark.parametrize('execution', [
+    'INT i\n#i = 1 / 0',
+    'INT i\n#i = 1 MOD 0',
+    'INT i\n#i = 4294967296 * 4294967296',
+], ids=['division by zero', 'modulo by zero', 'over 64 bits'])
+def test_not_folded(execution):
+    expr, = optimized(execution)
+    assert isinstance(expr, BinOp)
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_division_by_zero_at_run_time(level):
+    with pytest.raises(ZeroDivisionError):
+        output(program('INT i\n#i = 0\n@Stdio.out(#i)\n#i = 1 / 0'), level)
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_over_64_bits_at_run_time(level):
+    assert output(program('INT i\n#i = 4294967296 * 4294967296\n@Stdio.out(#i)'), level) == [str(2 ** 64)]
+
+
+def test_identities():
+    # -0.0 + 0 is 0.0, so adding 0 to a FLOAT is kept, adding it to an INT, subtracting it and * 1 are not
+    execution = 'INT i\nFLOAT f\nFLOAT g\n#i = 3\n#f = -0.0\n#g = #f + 0\n#g = #f - 0\n#i = 1 * #i + 0'
+    assert [type(expr).__name__ for expr in optimized(execution, 1)] == ['Num', 'Num', 'BinOp', 'BinOp', 'BinOp']
+    assert [type(expr).__name__ for expr in optimized(execution, 2)] == ['Num', 'Num', 'BinOp', 'Var', 'Var']
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_negative_zero_plus_zero(level):
+    assert output(program('FLOAT f\nFLOAT g\n#f = -0.0\n#g = #f + 0\n@Stdio.out(#g)'), level) == ['0.0']
+
+
+def test_int_literal_conversion():
+    # a literal assigned to an INT variable is converted as int() does at run time, one to a FLOAT is kept
+    int_expr, float_expr = optimized('INT i\nFLOAT f\n#i = 2.7\n#f = 2')
+    assert type(int_expr.value) is int and int_expr.value == 2
+    assert type(float_expr.value) is int and float_expr.value == 2
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_int_literal_conversion_at_run_time(level):
+    assert output(program('INT i\n#i = 2.7\n@Stdio.out(#i)'), level) == ['2']
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('name', sorted(os.listdir(EXAMPLES)))
+def test_examples_levels(name, backend, tmp_path):
+    stdin = inputs(200, str(tmp_path / 'text'))[name]
+    with open(os.path.join(EXAMPLES, name), 'r') as f:
+        source = f.read()
+    outputs = []
+    for level in LEVELS:
+        random.seed(0)
+        outputs.append(output(source, level, backend, stdin))
+    assert all(result == outputs[0] for result in outputs)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('seed', range(5))
+def test_generated_levels(seed, backend):
+    source = generate(400, functions=2, depth=3, seed=seed)
+    outputs = [output(source, level, backend) for level in LEVELS]
+    assert outputs[0] and all(result == outputs[0] for result in outputs)
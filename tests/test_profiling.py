@@ -0,0 +1,28 @@
+import os
+import time
+
+import pytest
+
+from interpreter.compilation.python_source import profile_source
+from interpreter.workloads.examples import EXAMPLES
+
+
+@pytest.mark.parametrize('memory', [True, False])
+@pytest.mark.parametrize('backend', ['source', 'ast'])
+def test_hooks_get_complete_phases_in_turn(backend, memory):
+    with open(os.path.join(EXAMPLES, 'e06'), 'r') as f:
+        text = f.read()
+    calls = []
+
+    def hook(phase):
+        calls.append((phase, phase.seconds, phase.peak_memory, dict(phase.counts), time.perf_counter()))
+
+    content, phases = profile_source(text, 1, backend, memory, hooks=(hook,))
+    assert [call[0] for call in calls] == phases
+    for phase, seconds, peak_memory, counts, _ in calls:
+        # nothing is filled in after the hook got the phase
+        assert (seconds, peak_memory, counts) == (phase.seconds, phase.peak_memory, phase.counts)
+        assert counts and (peak_memory is not None) == memory
+    # every hook runs before the next phase starts
+    for previous, (phase, seconds, _, _, called) in zip(calls, calls[1:]):
+        assert previous[4] <= called - seconds
@@ -0,0 +1,33 @@
+import io
+
+import pytest
+
+from interpreter.compilation import runner
+from interpreter.vm import machine
+
+
+def program(execution):
+    return 'Libraries {{\n-> Stdio\n}}\n\nFunctions {{\n\n}}\n\nExecution {{\n{}\n}}\n'.format(execution)
+
+
+def python_output(source, backend):
+    stdout = io.StringIO()
+    runner.run(source, io.StringIO(''), stdout, backend=backend)
+    return stdout.getvalue()
+
+
+def vm_output(source):
+    stdout = io.StringIO()
+    machine.run(source, io.StringIO(''), stdout)
+    return stdout.getvalue()
+
+
+@pytest.mark.parametrize('backend', runner.BACKENDS)
+@pytest.mark.parametrize('execution', [
+    "@Stdio.out('a\\tb')",
+    "STRING s\n#s = 'a\\\\b\\n'\n@Stdio.out(#s)",
+    "STRING s\n#s = 'no escapes'\n@Stdio.out(#s)",
+], ids=['argument', 'assigned', 'plain'])
+def test_escaped_strings(execution, backend):
+    source = program(execution)
+    assert vm_output(source) == python_output(source, backend)